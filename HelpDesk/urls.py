@@ -10,9 +10,4 @@ urlpatterns = [
 
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL,  document_root=settings.MEDIA_ROOT)
-    urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
-
-admin.site.site_header = "Helpdesk Administration"
-admin.site.site_title  = "Helpdesk Admin Portal"
-admin.site.index_title = "Welcome to Helpdesk Admin Panel"
 
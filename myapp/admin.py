@@ -1,5 +1,12 @@
+from bisect import bisect_left
+from functools import lru_cache
+
 from django.contrib import admin
+from django.db.models import Count, Q
+from django.db.models.functions import Now, Substr
+from django.urls import reverse
 from django.utils.html import format_html
+from django.utils.safestring import mark_safe
 
 from .models import (
     Department, DepartmentMember,
@@ -12,6 +19,43 @@ from .models import (
 )
 from import_export.admin import ImportExportModelAdmin
 
+_BADGE_HTML = ('<span style="background:{};color:white;padding:4px 12px;'
+               'border-radius:6px;font-weight:600;">{}</span>')
+_ICON_BADGE_HTML = ('<span style="background:{};color:white;padding:4px 12px;'
+                    'border-radius:6px;font-weight:600;"><i class="{}"></i> {}</span>')
+
+_ACTIVE_HTML = mark_safe('<span style="background:#d1fae5;color:#065f46;padding:4px 12px;'
+                         'border-radius:6px;font-weight:600;">Active</span>')
+_INACTIVE_HTML = mark_safe('<span style="background:#fee2e2;color:#991b1b;padding:4px 12px;'
+                           'border-radius:6px;font-weight:600;">Inactive</span>')
+_NO_PERMISSIONS_HTML = mark_safe('<span style="color:#94a3b8;">No special permissions</span>')
+_NO_DEPARTMENT_HTML = mark_safe('<span style="color:#94a3b8;">—</span>')
+
+_ROLE_COLORS = {'MEMBER':'#94a3b8','LEAD':'#3b82f6','MANAGER':'#8b5cf6','HEAD':'#ef4444'}
+_STATUS_COLORS = {
+    'Open':'#3b82f6','In Progress':'#f59e0b','Closed':'#94a3b8',
+    'Resolved':'#10b981','Reopen':'#ef4444','Expired':'#64748b',
+}
+
+# Open-ticket colour: green up to 5, amber above 5, red above 10.
+_OPEN_THRESHOLDS = (5, 10)
+_OPEN_COLORS = ('#10b981', '#f59e0b', '#ef4444')
+
+_RATING_HTML = {
+    i: mark_safe('<span style="color:{};font-size:16px;">{}</span>'.format(
+        '#10b981' if i >= 4 else '#f59e0b' if i == 3 else '#ef4444', '⭐' * i))
+    for i in range(6)
+}
+
+@lru_cache(maxsize=1)
+def _task_change_url_pattern():
+    return reverse('admin:myapp_taskdetail_change', args=[0]).replace('/0/change/', '/{}/change/')
+
+
+def _task_change_url(task_id):
+    return _task_change_url_pattern().format(task_id)
+
+
 @admin.register(Department)
 class DepartmentAdmin(admin.ModelAdmin):
     list_display   = ['name', 'code', 'colored_badge', 'active_members',
@@ -26,29 +70,33 @@ class DepartmentAdmin(admin.ModelAdmin):
         ('Metadata', {'fields': ('created_by', 'created_at', 'updated_at'), 'classes': ('collapse',)}),
     )
 
-    def colored_badge(self, obj):
-        return format_html(
-            '<span style="background:{};color:white;padding:4px 12px;border-radius:6px;font-weight:600;">'
-            '<i class="{}"></i> {}</span>',
-            obj.color, obj.icon, obj.name
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            _active_members=Count('departmentmember', filter=Q(departmentmember__is_active=True),
+                                  distinct=True),
+            _open_tickets=Count('department_tasks', filter=Q(department_tasks__TASK_STATUS='Open'),
+                                distinct=True),
         )
+
+    def colored_badge(self, obj):
+        return format_html(_ICON_BADGE_HTML, obj.color, obj.icon, obj.name)
     colored_badge.short_description = 'Badge'
 
     def active_members(self, obj):
         return format_html('<span style="color:#10b981;font-weight:600;">{} members</span>',
-                           obj.get_active_members_count())
+                           obj._active_members)
     active_members.short_description = 'Members'
+    active_members.admin_order_field = '_active_members'
 
     def open_tickets(self, obj):
-        count = obj.get_open_tickets_count()
-        color = '#ef4444' if count > 10 else '#f59e0b' if count > 5 else '#10b981'
+        count = obj._open_tickets
+        color = _OPEN_COLORS[bisect_left(_OPEN_THRESHOLDS, count)]
         return format_html('<span style="color:{};font-weight:600;">{} open</span>', color, count)
     open_tickets.short_description = 'Open'
+    open_tickets.admin_order_field = '_open_tickets'
 
     def is_active_badge(self, obj):
-        if obj.is_active:
-            return format_html('<span style="background:#d1fae5;color:#065f46;padding:4px 12px;border-radius:6px;font-weight:600;">Active</span>')
-        return format_html('<span style="background:#fee2e2;color:#991b1b;padding:4px 12px;border-radius:6px;font-weight:600;">Inactive</span>')
+        return _ACTIVE_HTML if obj.is_active else _INACTIVE_HTML
     is_active_badge.short_description = 'Status'
 
     def save_model(self, request, obj, form, change):
@@ -64,6 +112,7 @@ class DepartmentMemberAdmin(admin.ModelAdmin):
     list_filter    = ['department', 'role', 'is_active', 'joined_at']
     search_fields  = ['user__username', 'user__email', 'department__name']
     readonly_fields = ['joined_at', 'added_by']
+    list_select_related = ['user', 'department']
 
     fieldsets = (
         ('Member', {'fields': ('user', 'department', 'role', 'is_active')}),
@@ -71,24 +120,20 @@ class DepartmentMemberAdmin(admin.ModelAdmin):
         ('Metadata', {'fields': ('added_by', 'joined_at'), 'classes': ('collapse',)}),
     )
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user', 'department', 'added_by')
+
     def user_info(self, obj):
         return format_html('<strong>{}</strong><br><small style="color:#64748b;">{}</small>',
                            obj.user.get_full_name() or obj.user.username, obj.user.email)
     user_info.short_description = 'User'
 
     def department_badge(self, obj):
-        return format_html(
-            '<span style="background:{};color:white;padding:4px 12px;border-radius:6px;font-weight:600;">{}</span>',
-            obj.department.color, obj.department.name
-        )
+        return format_html(_BADGE_HTML, obj.department.color, obj.department.name)
     department_badge.short_description = 'Department'
 
     def role_badge(self, obj):
-        colors = {'MEMBER':'#94a3b8','LEAD':'#3b82f6','MANAGER':'#8b5cf6','HEAD':'#ef4444'}
-        return format_html(
-            '<span style="background:{};color:white;padding:4px 12px;border-radius:6px;font-weight:600;">{}</span>',
-            colors.get(obj.role, '#94a3b8'), obj.get_role_display()
-        )
+        return format_html(_BADGE_HTML, _ROLE_COLORS.get(obj.role, '#94a3b8'), obj.get_role_display())
     role_badge.short_description = 'Role'
 
     def permissions_summary(self, obj):
@@ -98,13 +143,11 @@ class DepartmentMemberAdmin(admin.ModelAdmin):
         if obj.can_delete_tickets: perms.append('Delete')
         if perms:
             return format_html('<span style="color:#10b981;font-size:.875rem;">{}</span>', ', '.join(perms))
-        return format_html('<span style="color:#94a3b8;">No special permissions</span>')
+        return _NO_PERMISSIONS_HTML
     permissions_summary.short_description = 'Permissions'
 
     def is_active_badge(self, obj):
-        if obj.is_active:
-            return format_html('<span style="background:#d1fae5;color:#065f46;padding:4px 12px;border-radius:6px;font-weight:600;">Active</span>')
-        return format_html('<span style="background:#fee2e2;color:#991b1b;padding:4px 12px;border-radius:6px;font-weight:600;">Inactive</span>')
+        return _ACTIVE_HTML if obj.is_active else _INACTIVE_HTML
     is_active_badge.short_description = 'Status'
 
     def save_model(self, request, obj, form, change):
@@ -117,6 +160,7 @@ class UserProfileAdmin(admin.ModelAdmin):
     list_display  = ['user', 'department', 'Address', 'City', 'State', 'phone']
     list_filter   = ['department', 'City', 'State']
     search_fields = ['user__username', 'user__email', 'Address', 'phone']
+    list_select_related = ['user']
 
 @admin.register(TaskDetail)
 class TaskDetailsAdmin(admin.ModelAdmin):
@@ -133,6 +177,8 @@ class TaskDetailsAdmin(admin.ModelAdmin):
     search_fields = ['TASK_TITLE', 'TASK_DESCRIPTION', 'TASK_HOLDER', 'TASK_CREATED__username']
     date_hierarchy = 'TASK_CREATED_ON'
     list_per_page  = 25
+    list_select_related = ['assigned_department', 'category', 'TASK_CREATED', 'TASK_CLOSED']
+    show_full_result_count = False
     readonly_fields = [
         'TASK_CREATED_ON', 'TASK_CLOSED_ON', 'updated_at', 'assigned_at', 'views_count',
     ]
@@ -155,23 +201,16 @@ class TaskDetailsAdmin(admin.ModelAdmin):
     )
 
     def department_badge(self, obj):
-        if obj.assigned_department:
-            return format_html(
-                '<span style="background:{};color:white;padding:4px 12px;border-radius:6px;font-weight:600;">'
-                '<i class="{}"></i> {}</span>',
-                obj.assigned_department.color, obj.assigned_department.icon, obj.assigned_department.name
-            )
-        return format_html('<span style="color:#94a3b8;">—</span>')
+        dept = obj.assigned_department
+        if dept:
+            return format_html(_ICON_BADGE_HTML, dept.color, dept.icon, dept.name)
+        return _NO_DEPARTMENT_HTML
     department_badge.short_description = 'Department'
 
     def status_badge(self, obj):
-        colors = {
-            'Open':'#3b82f6','In Progress':'#f59e0b','Closed':'#94a3b8',
-            'Resolved':'#10b981','Reopen':'#ef4444','Expired':'#64748b',
-        }
         return format_html(
             '<span style="background:{};color:white;padding:4px 12px;border-radius:6px;font-weight:600;font-size:.75rem;">{}</span>',
-            colors.get(obj.TASK_STATUS, '#94a3b8'), obj.TASK_STATUS
+            _STATUS_COLORS.get(obj.TASK_STATUS, '#94a3b8'), obj.TASK_STATUS
         )
     status_badge.short_description = 'Status'
 
@@ -180,6 +219,7 @@ class MyCartAdmin(admin.ModelAdmin):
     list_display  = ['id', 'user', 'task', 'task_count', 'accepted_at']
     list_filter   = ['accepted_at', 'user']
     search_fields = ['user__username', 'task__TASK_TITLE']
+    list_select_related = ['user', 'task']
 
 @admin.register(ActivityLog)
 class ActivityLogAdmin(admin.ModelAdmin):
@@ -190,6 +230,13 @@ class ActivityLogAdmin(admin.ModelAdmin):
     ordering       = ['-timestamp']
     readonly_fields = ['user', 'task', 'action', 'title', 'description',
                        'old_value', 'new_value', 'timestamp']
+    list_select_related = ['user']
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            _task_title=Substr('task__TASK_TITLE', 1, 40),
+        )
 
     def has_add_permission(self, request):
         return False
@@ -206,10 +253,10 @@ class ActivityLogAdmin(admin.ModelAdmin):
     action_badge.short_description = 'Action'
 
     def task_link(self, obj):
-        if obj.task:
+        if obj.task_id:
             return format_html(
-                '<a href="/admin/myapp/taskdetail/{}/change/">#{} {}</a>',
-                obj.task.id, obj.task.id, obj.task.TASK_TITLE[:40]
+                '<a href="{}">#{} {}</a>',
+                _task_change_url(obj.task_id), obj.task_id, obj._task_title
             )
         return '—'
     task_link.short_description = 'Ticket'
@@ -220,6 +267,7 @@ class UserCommentAdmin(admin.ModelAdmin):
     list_filter   = ['created_at']
     search_fields = ['user__username', 'task__TASK_TITLE', 'Reopen_comment', 'Closing_comment']
     readonly_fields = ['created_at']
+    list_select_related = ['user', 'task']
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -264,6 +312,8 @@ class AIMLLogAdmin(admin.ModelAdmin):
     search_fields   = ['task__TASK_TITLE', 'input_data', 'output_data']
     readonly_fields = ['task', 'log_type', 'input_data', 'output_data', 'confidence', 'created_at']
     date_hierarchy  = 'created_at'
+    list_select_related = ['task']
+    show_full_result_count = False
 
     def has_add_permission(self, request):
         return False
@@ -280,6 +330,8 @@ class NotificationAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at', 'read_at', 'email_sent_at']
     list_per_page   = 50
     date_hierarchy  = 'created_at'
+    list_select_related = ['user', 'task']
+    show_full_result_count = False
 
     fieldsets = (
         ('Basic', {'fields': ('user', 'task', 'notification_type')}),
@@ -291,8 +343,7 @@ class NotificationAdmin(admin.ModelAdmin):
     actions = ['mark_as_read', 'mark_as_unread']
 
     def mark_as_read(self, request, queryset):
-        from django.utils import timezone
-        updated = queryset.update(is_read=True, read_at=timezone.now())
+        updated = queryset.update(is_read=True, read_at=Now())
         self.message_user(request, f'{updated} notifications marked as read.')
     mark_as_read.short_description = 'Mark selected as read'
 
@@ -311,6 +362,8 @@ class TaskHistoryAdmin(admin.ModelAdmin):
     ordering        = ['-changed_at']
     readonly_fields = ['task', 'changed_by', 'action_type', 'field_name',
                        'old_value', 'new_value', 'description', 'changed_at']
+    list_select_related = ['task', 'changed_by']
+    show_full_result_count = False
 
     fieldsets = (
         ('Change', {'fields': ('task', 'changed_by', 'action_type', 'changed_at')}),
@@ -319,8 +372,7 @@ class TaskHistoryAdmin(admin.ModelAdmin):
     )
 
     def task_link(self, obj):
-        return format_html('<a href="/admin/myapp/taskdetail/{}/change/">Task #{}</a>',
-                           obj.task.id, obj.task.id)
+        return format_html('<a href="{}">Task #{}</a>', _task_change_url(obj.task_id), obj.task_id)
     task_link.short_description = 'Task'
 
     def has_add_permission(self, request):
@@ -337,6 +389,7 @@ class CannedResponseAdmin(admin.ModelAdmin):
     search_fields   = ['title', 'content']
     ordering        = ['-usage_count', 'title']
     readonly_fields = ['usage_count', 'created_by', 'created_at', 'updated_at']
+    list_select_related = ['category', 'department', 'created_by']
 
     fieldsets = (
         ('Response', {'fields': ('title', 'content')}),
@@ -359,6 +412,7 @@ class TaskRatingAdmin(admin.ModelAdmin):
     date_hierarchy  = 'rated_at'
     ordering        = ['-rated_at']
     readonly_fields = ['task', 'rated_by', 'rated_at']
+    list_select_related = ['task', 'rated_by']
 
     fieldsets = (
         ('Rating', {'fields': ('task', 'rated_by', 'rating', 'rated_at')}),
@@ -367,17 +421,9 @@ class TaskRatingAdmin(admin.ModelAdmin):
     )
 
     def task_link(self, obj):
-        return format_html('<a href="/admin/myapp/taskdetail/{}/change/">Task #{}</a>',
-                           obj.task.id, obj.task.id)
+        return format_html('<a href="{}">Task #{}</a>', _task_change_url(obj.task_id), obj.task_id)
     task_link.short_description = 'Task'
 
     def rating_stars(self, obj):
-        stars = '⭐' * obj.rating
-        color = '#10b981' if obj.rating >= 4 else '#f59e0b' if obj.rating == 3 else '#ef4444'
-        return format_html('<span style="color:{};font-size:16px;">{}</span>', color, stars)
+        return _RATING_HTML.get(obj.rating, _RATING_HTML[0])
     rating_stars.short_description = 'Rating'
-
-admin.site.site_header = "Helpdesk Administration"
-admin.site.site_title  = "Helpdesk Admin"
-admin.site.index_title = "Welcome to Helpdesk Admin Panel"
-
@@ -1,333 +1,369 @@
-from django.db.models import Count, Avg, Q, F, Sum
+from django.db.models import Count, Avg, Q, F, Sum, ExpressionWrapper, DurationField, DateField
+from django.db.models.functions import Coalesce, TruncDate
+from django.core.cache import cache
 from django.utils import timezone
 from datetime import timedelta, datetime, date
 from collections import defaultdict
+from functools import wraps
 from .models import TaskDetail, Department, DepartmentMember, ActivityLog, TaskHistory
 from django.contrib.auth.models import User
+import copy
+import hashlib
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
-def get_date_range(range_type='30_days'):
-    today = date.today()
-
-    if range_type == '7_days':
-        return today - timedelta(days=7), today
-    if range_type == '30_days':
-        return today - timedelta(days=30), today
-    if range_type == '90_days':
-        return today - timedelta(days=90), today
-    if range_type == 'this_month':
-        return today.replace(day=1), today
-    if range_type == 'last_month':
-        last = today.replace(day=1) - timedelta(days=1)
-        return last.replace(day=1), last
-    if range_type == 'this_year':
-        return today.replace(month=1, day=1), today
-    return today - timedelta(days=30), today
+RESOLUTION_DURATION = ExpressionWrapper(
+    F('TASK_CLOSED_ON') - F('TASK_CREATED_ON'), output_field=DurationField()
+)
 
-def get_task_statistics(start_date=None, end_date=None, department=None):
-    try:
-        tasks = TaskDetail.objects.all()
-
-        if start_date and end_date:
-            tasks = tasks.filter(TASK_CREATED_ON__range=[start_date, end_date])
-        if department:
-            tasks = tasks.filter(assigned_department=department)
-
-        stats = {
-            'total':       tasks.count(),
-            'open':        tasks.filter(TASK_STATUS='Open').count(),
-            'in_progress': tasks.filter(TASK_STATUS='In Progress').count(),
-            'closed':      tasks.filter(TASK_STATUS='Closed').count(),
-            'resolved':    tasks.filter(TASK_STATUS='Resolved').count(),
-        }
-        stats['by_priority'] = {
-            'urgent': tasks.filter(priority='URGENT').count(),
-            'high':   tasks.filter(priority='HIGH').count(),
-            'medium': tasks.filter(priority='MEDIUM').count(),
-            'low':    tasks.filter(priority='LOW').count(),
-        }
+Q_OPEN                = Q(TASK_STATUS='Open')
+Q_CLOSED              = Q(TASK_STATUS__in=['Closed', 'Resolved'])
+Q_RESOLVED_WITH_CLOSE = Q(TASK_STATUS__in=['Closed', 'Resolved'], TASK_CLOSED_ON__isnull=False)
 
-        completed = stats['closed'] + stats['resolved']
-        stats['completion_rate'] = (
-            completed / stats['total'] * 100 if stats['total'] > 0 else 0
-        )
-
-        resolved_tasks = tasks.filter(
-            TASK_STATUS__in=['Closed', 'Resolved'],
-            TASK_CLOSED_ON__isnull=False,
-        )
-        total_days = count = 0
-        for task in resolved_tasks:
-            if task.TASK_CLOSED_ON and task.TASK_CREATED_ON:
-                total_days += (task.TASK_CLOSED_ON - task.TASK_CREATED_ON).days
-                count += 1
-        stats['avg_resolution_hours'] = round(total_days / count * 24, 2) if count else 0
-
-        return stats
-    except Exception as e:
-        logger.error(f"get_task_statistics error: {e}")
-        return {
-            'total': 0, 'open': 0, 'in_progress': 0, 'closed': 0,
-            'resolved': 0, 'completion_rate': 0, 'avg_resolution_hours': 0,
-            'by_priority': {'urgent': 0, 'high': 0, 'medium': 0, 'low': 0},
-        }
 
-def get_tasks_over_time(start_date=None, end_date=None, department=None):
-    try:
-        tasks = TaskDetail.objects.all()
-        if start_date and end_date:
-            tasks = tasks.filter(TASK_CREATED_ON__range=[start_date, end_date])
-        if department:
-            tasks = tasks.filter(assigned_department=department)
-
-        tasks_by_date = tasks.values('TASK_CREATED_ON').annotate(
-            count=Count('id')
-        ).order_by('TASK_CREATED_ON')
-        count_map = {
-            item['TASK_CREATED_ON']: item['count']
-            for item in tasks_by_date
-            if item['TASK_CREATED_ON'] is not None
-        }
+def _duration_hours(duration):
+    return round(duration.total_seconds() / 3600, 2) if duration else 0
 
-        if not start_date or not end_date:
-            return [
-                {'date': str(d), 'count': c}
-                for d, c in sorted(count_map.items(), key=lambda x: x[0])
-            ]
-
-        series = []
-        day = start_date
-        while day <= end_date:
-            series.append({
-                'date': day.strftime('%b %d'),
-                'count': count_map.get(day, 0),
-            })
-            day += timedelta(days=1)
-        return series
-    except Exception as e:
-        logger.error(f"get_tasks_over_time error: {e}")
-        return []
 
-def get_department_statistics(start_date=None, end_date=None):
-    try:
-        departments = Department.objects.filter(is_active=True)
-        result = []
-
-        for dept in departments:
-            tasks = TaskDetail.objects.filter(assigned_department=dept)
-            if start_date and end_date:
-                tasks = tasks.filter(TASK_CREATED_ON__range=[start_date, end_date])
-
-            total  = tasks.count()
-            closed = tasks.filter(TASK_STATUS__in=['Closed', 'Resolved']).count()
-            open_t = tasks.filter(TASK_STATUS='Open').count()
-
-            total_days = count = 0
-            for task in tasks.filter(TASK_STATUS__in=['Closed','Resolved'], TASK_CLOSED_ON__isnull=False):
-                if task.TASK_CLOSED_ON and task.TASK_CREATED_ON:
-                    total_days += (task.TASK_CLOSED_ON - task.TASK_CREATED_ON).days
-                    count += 1
-
-            result.append({
-                'name':                  dept.name,
-                'color':                 dept.color,
-                'total_tasks':           total,
-                'open_tasks':            open_t,
-                'closed_tasks':          closed,
-                'completion_rate':       round(closed / total * 100, 2) if total else 0,
-                'avg_resolution_hours':  round(total_days / count * 24, 2) if count else 0,
-                'members_count':         dept.get_active_members_count(),
-            })
-
-        return result
-    except Exception as e:
-        logger.error(f"get_department_statistics error: {e}")
-        return []
+ANALYTICS_VERSION_KEY = 'analytics:version'
 
 
-def get_department_comparison():
-    try:
-        departments = Department.objects.filter(is_active=True)
-        result = {
-            'labels':      [],
-            'total_tasks': [],
-            'open_tasks':  [],
-            'closed_tasks':[],
-            'colors':      [],
-        }
-        for dept in departments:
-            tasks = TaskDetail.objects.filter(assigned_department=dept)
-            result['labels'].append(dept.name)
-            result['total_tasks'].append(tasks.count())
-            result['open_tasks'].append(tasks.filter(TASK_STATUS='Open').count())
-            result['closed_tasks'].append(tasks.filter(TASK_STATUS__in=['Closed','Resolved']).count())
-            result['colors'].append(dept.color)
-        return result
-    except Exception as e:
-        logger.error(f"get_department_comparison error: {e}")
-        return {'labels': [], 'total_tasks': [], 'open_tasks': [], 'closed_tasks': [], 'colors': []}
+def cached_analytics(fallback=None, timeout=300):
+    """Cache a getter's result per argument set; writes to tasks bump the key version.
 
-def get_top_task_creators(limit=10, start_date=None, end_date=None):
-    try:
-        tasks = TaskDetail.objects.filter(TASK_CREATED__isnull=False)
-        if start_date and end_date:
-            tasks = tasks.filter(TASK_CREATED_ON__range=[start_date, end_date])
+    A failing query is logged and answered with a copy of ``fallback``, which is
+    never written to the cache, so the next call retries the database.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            parts = [getattr(a, 'pk', a) for a in args]
+            parts += [(k, getattr(v, 'pk', v)) for k, v in sorted(kwargs.items())]
+            digest = hashlib.md5(repr(parts).encode()).hexdigest()
+            try:
+                version = cache.get_or_set(ANALYTICS_VERSION_KEY, time.time_ns, None)
+                return cache.get_or_set(
+                    f'analytics:{func.__name__}:{digest}',
+                    lambda: func(*args, **kwargs),
+                    timeout,
+                    version=version,
+                )
+            except Exception as e:
+                logger.error(f"{func.__name__} error: {e}")
+                return copy.deepcopy(fallback)
+        return wrapper
+    return decorator
 
-        top = tasks.values('TASK_CREATED__username', 'TASK_CREATED__id').annotate(
-            count=Count('id')
-        ).order_by('-count')[:limit]
 
-        result = []
-        for item in top:
-            try:
-                user = User.objects.get(id=item['TASK_CREATED__id'])
-                result.append({'user': user, 'username': item['TASK_CREATED__username'],
-                               'count': item['count']})
-            except User.DoesNotExist:
-                pass
-        return result
-    except Exception as e:
-        logger.error(f"get_top_task_creators error: {e}")
-        return []
+def _last_month(today):
+    last = today.replace(day=1) - timedelta(days=1)
+    return last.replace(day=1), last
 
 
-def get_top_task_resolvers(limit=10, start_date=None, end_date=None):
-    try:
-        resolver_events = TaskHistory.objects.filter(
-            changed_by__isnull=False
-        ).filter(
-            Q(action_type='CLOSED') |
-            Q(action_type='STATUS_CHANGED', new_value='Resolved')
-        )
-        if start_date and end_date:
-            resolver_events = resolver_events.filter(changed_at__range=[start_date, end_date])
-
-        top = resolver_events.values('changed_by__username', 'changed_by__id').annotate(
-            count=Count('id')
-        ).order_by('-count')[:limit]
-
-        result = []
-        for item in top:
-            try:
-                user = User.objects.get(id=item['changed_by__id'])
-                resolved_task_ids = resolver_events.filter(
-                    changed_by=user
-                ).values_list('task_id', flat=True).distinct()
-                user_tasks = TaskDetail.objects.filter(
-                    id__in=resolved_task_ids
-                )
-                total_days = count = 0
-                for t in user_tasks:
-                    completed_on = t.resolved_at or t.TASK_CLOSED_ON
-                    if completed_on and t.TASK_CREATED_ON:
-                        total_days += (completed_on - t.TASK_CREATED_ON).days
-                        count += 1
-                avg_hours = round(total_days / count * 24, 2) if count else 0
-                result.append({
-                    'user':                user,
-                    'username':            item['changed_by__username'],
-                    'count':               item['count'],
-                    'avg_resolution_hours':avg_hours,
-                })
-            except User.DoesNotExist:
-                pass
-        return result
-    except Exception as e:
-        logger.error(f"get_top_task_resolvers error: {e}")
-        return []
+_RANGE_FNS = {
+    '7_days':     lambda t: (t - timedelta(days=7), t),
+    '30_days':    lambda t: (t - timedelta(days=30), t),
+    '90_days':    lambda t: (t - timedelta(days=90), t),
+    'this_month': lambda t: (t.replace(day=1), t),
+    'last_month': _last_month,
+    'this_year':  lambda t: (t.replace(month=1, day=1), t),
+}
 
-def get_priority_distribution(start_date=None, end_date=None, department=None):
-    try:
-        tasks = TaskDetail.objects.all()
-        if start_date and end_date:
-            tasks = tasks.filter(TASK_CREATED_ON__range=[start_date, end_date])
-        if department:
-            tasks = tasks.filter(assigned_department=department)
-        return {
-            'URGENT': tasks.filter(priority='URGENT').count(),
-            'HIGH':   tasks.filter(priority='HIGH').count(),
-            'MEDIUM': tasks.filter(priority='MEDIUM').count(),
-            'LOW':    tasks.filter(priority='LOW').count(),
-        }
-    except Exception as e:
-        logger.error(f"get_priority_distribution error: {e}")
-        return {'URGENT': 0, 'HIGH': 0, 'MEDIUM': 0, 'LOW': 0}
 
+def get_date_range(range_type='30_days'):
+    return _RANGE_FNS.get(range_type, _RANGE_FNS['30_days'])(date.today())
 
-def get_category_distribution(start_date=None, end_date=None):
-    try:
-        tasks = TaskDetail.objects.filter(category__isnull=False)
-        if start_date and end_date:
-            tasks = tasks.filter(TASK_CREATED_ON__range=[start_date, end_date])
-        cats = tasks.values(
-            'category__name', 'category__color', 'category__icon'
-        ).annotate(count=Count('id')).order_by('-count')
+@cached_analytics(fallback={
+    'total': 0, 'open': 0, 'in_progress': 0, 'closed': 0,
+    'resolved': 0, 'completion_rate': 0, 'avg_resolution_hours': 0,
+    'by_priority': {'urgent': 0, 'high': 0, 'medium': 0, 'low': 0},
+})
+def get_task_statistics(start_date=None, end_date=None, department=None):
+    tasks = TaskDetail.objects.all()
+
+    if start_date and end_date:
+        tasks = tasks.filter(TASK_CREATED_ON__range=[start_date, end_date])
+    if department:
+        tasks = tasks.filter(assigned_department=department)
+
+    agg = tasks.aggregate(
+        total=Count('id'),
+        open=Count('id', filter=Q_OPEN),
+        in_progress=Count('id', filter=Q(TASK_STATUS='In Progress')),
+        closed=Count('id', filter=Q(TASK_STATUS='Closed')),
+        resolved=Count('id', filter=Q(TASK_STATUS='Resolved')),
+        urgent=Count('id', filter=Q(priority='URGENT')),
+        high=Count('id', filter=Q(priority='HIGH')),
+        medium=Count('id', filter=Q(priority='MEDIUM')),
+        low=Count('id', filter=Q(priority='LOW')),
+        avg_dur=Avg(RESOLUTION_DURATION, filter=Q_RESOLVED_WITH_CLOSE),
+    )
+
+    stats = {
+        'total':       agg['total'],
+        'open':        agg['open'],
+        'in_progress': agg['in_progress'],
+        'closed':      agg['closed'],
+        'resolved':    agg['resolved'],
+    }
+    stats['by_priority'] = {
+        'urgent': agg['urgent'],
+        'high':   agg['high'],
+        'medium': agg['medium'],
+        'low':    agg['low'],
+    }
+
+    completed = stats['closed'] + stats['resolved']
+    stats['completion_rate'] = (
+        completed / stats['total'] * 100 if stats['total'] > 0 else 0
+    )
+    stats['avg_resolution_hours'] = _duration_hours(agg['avg_dur'])
+
+    return stats
+
+@cached_analytics(fallback=[])
+def get_tasks_over_time(start_date=None, end_date=None, department=None):
+    tasks = TaskDetail.objects.all()
+    if start_date and end_date:
+        tasks = tasks.filter(TASK_CREATED_ON__range=[start_date, end_date])
+    if department:
+        tasks = tasks.filter(assigned_department=department)
+
+    tasks_by_date = tasks.filter(TASK_CREATED_ON__isnull=False).values(
+        'TASK_CREATED_ON'
+    ).annotate(count=Count('id')).order_by('TASK_CREATED_ON')
+
+    if not start_date or not end_date:
         return [
-            {'name': c['category__name'], 'count': c['count'],
-             'color': c['category__color'], 'icon': c['category__icon']}
-            for c in cats
+            {'date': str(item['TASK_CREATED_ON']), 'count': item['count']}
+            for item in tasks_by_date
         ]
-    except Exception as e:
-        logger.error(f"get_category_distribution error: {e}")
-        return []
 
+    count_map = {item['TASK_CREATED_ON']: item['count'] for item in tasks_by_date}
 
-def get_sla_compliance(start_date=None, end_date=None):
-    try:
-        tasks = TaskDetail.objects.filter(
-            TASK_STATUS__in=['Closed', 'Resolved'],
-            TASK_DUE_DATE__isnull=False,
-            TASK_CLOSED_ON__isnull=False,
-        )
-        if start_date and end_date:
-            tasks = tasks.filter(TASK_CLOSED_ON__range=[start_date, end_date])
-
-        total = tasks.count()
-        if total == 0:
-            return {'total': 0, 'on_time': 0, 'overdue': 0, 'compliance_rate': 0}
-
-        on_time = overdue = 0
-        for task in tasks:
-            if task.TASK_CLOSED_ON <= task.TASK_DUE_DATE:
-                on_time += 1
-            else:
-                overdue += 1
+    series = []
+    day = start_date
+    while day <= end_date:
+        series.append({
+            'date': day.strftime('%b %d'),
+            'count': count_map.get(day, 0),
+        })
+        day += timedelta(days=1)
+    return series
 
-        return {
-            'total':           total,
-            'on_time':         on_time,
-            'overdue':         overdue,
-            'compliance_rate': round(on_time / total * 100, 2),
-        }
-    except Exception as e:
-        logger.error(f"get_sla_compliance error: {e}")
+@cached_analytics(fallback=[])
+def get_department_statistics(start_date=None, end_date=None):
+    departments = Department.objects.filter(is_active=True).values(
+        'id', 'name', 'color'
+    ).annotate(
+        members_count=Count('departmentmember', filter=Q(departmentmember__is_active=True)),
+    ).order_by('name')
+
+    tasks = TaskDetail.objects.filter(assigned_department__is_active=True)
+    if start_date and end_date:
+        tasks = tasks.filter(TASK_CREATED_ON__range=[start_date, end_date])
+
+    rows = tasks.values('assigned_department_id').annotate(
+        total=Count('id'),
+        closed=Count('id', filter=Q_CLOSED),
+        open=Count('id', filter=Q_OPEN),
+        avg_dur=Avg(RESOLUTION_DURATION, filter=Q_RESOLVED_WITH_CLOSE),
+    ).order_by()
+    agg_by_id = {row['assigned_department_id']: row for row in rows}
+    empty = {'total': 0, 'closed': 0, 'open': 0, 'avg_dur': None}
+
+    result = []
+    for dept in departments:
+        row    = agg_by_id.get(dept['id'], empty)
+        total  = row['total']
+        closed = row['closed']
+        result.append({
+            'name':                  dept['name'],
+            'color':                 dept['color'],
+            'total_tasks':           total,
+            'open_tasks':            row['open'],
+            'closed_tasks':          closed,
+            'completion_rate':       round(closed / total * 100, 2) if total else 0,
+            'avg_resolution_hours':  _duration_hours(row['avg_dur']),
+            'members_count':         dept['members_count'],
+        })
+
+    return result
+
+
+@cached_analytics(fallback={'labels': [], 'total_tasks': [], 'open_tasks': [], 'closed_tasks': [], 'colors': []})
+def get_department_comparison():
+    departments = Department.objects.filter(is_active=True).values('id', 'name', 'color')
+    rows = TaskDetail.objects.filter(assigned_department__isnull=False).values(
+        'assigned_department_id'
+    ).annotate(
+        total=Count('id'),
+        open=Count('id', filter=Q_OPEN),
+        closed=Count('id', filter=Q_CLOSED),
+    ).order_by()
+    agg_by_id = {row['assigned_department_id']: row for row in rows}
+    empty = {'total': 0, 'open': 0, 'closed': 0}
+
+    result = {
+        'labels':      [],
+        'total_tasks': [],
+        'open_tasks':  [],
+        'closed_tasks':[],
+        'colors':      [],
+    }
+    for dept in departments:
+        row = agg_by_id.get(dept['id'], empty)
+        result['labels'].append(dept['name'])
+        result['total_tasks'].append(row['total'])
+        result['open_tasks'].append(row['open'])
+        result['closed_tasks'].append(row['closed'])
+        result['colors'].append(dept['color'])
+    return result
+
+@cached_analytics(fallback=[])
+def get_top_task_creators(limit=10, start_date=None, end_date=None):
+    tasks = TaskDetail.objects.filter(TASK_CREATED__isnull=False)
+    if start_date and end_date:
+        tasks = tasks.filter(TASK_CREATED_ON__range=[start_date, end_date])
+
+    top = list(tasks.values('TASK_CREATED__username', 'TASK_CREATED__id').annotate(
+        count=Count('id')
+    ).order_by('-count')[:limit])
+    user_map = User.objects.only('id', 'username').in_bulk(
+        [item['TASK_CREATED__id'] for item in top]
+    )
+
+    result = []
+    for item in top:
+        user = user_map.get(item['TASK_CREATED__id'])
+        if user is None:
+            continue
+        result.append({'user': user, 'username': item['TASK_CREATED__username'],
+                       'count': item['count']})
+    return result
+
+
+@cached_analytics(fallback=[])
+def get_top_task_resolvers(limit=10, start_date=None, end_date=None):
+    resolver_events = TaskHistory.objects.filter(
+        changed_by__isnull=False
+    ).filter(
+        Q(action_type='CLOSED') |
+        Q(action_type='STATUS_CHANGED', new_value='Resolved')
+    )
+    if start_date and end_date:
+        resolver_events = resolver_events.filter(changed_at__range=[start_date, end_date])
+
+    top = list(resolver_events.values('changed_by__username', 'changed_by__id').annotate(
+        count=Count('id'),
+        avg_duration=Avg(
+            ExpressionWrapper(
+                Coalesce(
+                    TruncDate('task__resolved_at'), F('task__TASK_CLOSED_ON'),
+                    output_field=DateField(),
+                ) - F('task__TASK_CREATED_ON'),
+                output_field=DurationField(),
+            )
+        ),
+    ).order_by('-count')[:limit])
+    user_map = User.objects.only('id', 'username').in_bulk(
+        [item['changed_by__id'] for item in top]
+    )
+
+    result = []
+    for item in top:
+        user = user_map.get(item['changed_by__id'])
+        if user is None:
+            continue
+        result.append({
+            'user':                user,
+            'username':            item['changed_by__username'],
+            'count':               item['count'],
+            'avg_resolution_hours':_duration_hours(item['avg_duration']),
+        })
+    return result
+
+@cached_analytics(fallback={'URGENT': 0, 'HIGH': 0, 'MEDIUM': 0, 'LOW': 0})
+def get_priority_distribution(start_date=None, end_date=None, department=None):
+    tasks = TaskDetail.objects.all()
+    if start_date and end_date:
+        tasks = tasks.filter(TASK_CREATED_ON__range=[start_date, end_date])
+    if department:
+        tasks = tasks.filter(assigned_department=department)
+    return {
+        'URGENT': tasks.filter(priority='URGENT').count(),
+        'HIGH':   tasks.filter(priority='HIGH').count(),
+        'MEDIUM': tasks.filter(priority='MEDIUM').count(),
+        'LOW':    tasks.filter(priority='LOW').count(),
+    }
+
+
+@cached_analytics(fallback=[])
+def get_category_distribution(start_date=None, end_date=None, limit=50):
+    tasks = TaskDetail.objects.filter(category__isnull=False)
+    if start_date and end_date:
+        tasks = tasks.filter(TASK_CREATED_ON__range=[start_date, end_date])
+    cats = tasks.values(
+        'category__name', 'category__color', 'category__icon'
+    ).annotate(count=Count('id')).order_by('-count')[:limit]
+    return [
+        {'name': c['category__name'], 'count': c['count'],
+         'color': c['category__color'], 'icon': c['category__icon']}
+        for c in cats
+    ]
+
+
+@cached_analytics(fallback={'total': 0, 'on_time': 0, 'overdue': 0, 'compliance_rate': 0})
+def get_sla_compliance(start_date=None, end_date=None):
+    tasks = TaskDetail.objects.filter(
+        TASK_STATUS__in=['Closed', 'Resolved'],
+        TASK_DUE_DATE__isnull=False,
+        TASK_CLOSED_ON__isnull=False,
+    )
+    if start_date and end_date:
+        tasks = tasks.filter(TASK_CLOSED_ON__range=[start_date, end_date])
+
+    counts = tasks.aggregate(
+        total=Count('id'),
+        on_time=Count('id', filter=Q(TASK_CLOSED_ON__lte=F('TASK_DUE_DATE'))),
+    )
+    total = counts['total']
+    if total == 0:
         return {'total': 0, 'on_time': 0, 'overdue': 0, 'compliance_rate': 0}
 
-def get_top_active_users(limit=10, start_date=None, end_date=None):
-    
-    try:
-        logs = ActivityLog.objects.all()
-        if start_date and end_date:
-            logs = logs.filter(timestamp__date__range=[start_date, end_date])
+    on_time = counts['on_time']
+    overdue = total - on_time
 
-        top = logs.values('user__username', 'user__id').annotate(
-            count=Count('id')
-        ).order_by('-count')[:limit]
+    return {
+        'total':           total,
+        'on_time':         on_time,
+        'overdue':         overdue,
+        'compliance_rate': round(on_time / total * 100, 2),
+    }
 
-        result = []
-        for item in top:
-            try:
-                user = User.objects.get(id=item['user__id'])
-                result.append({'user': user, 'username': item['user__username'],
-                               'count': item['count']})
-            except User.DoesNotExist:
-                pass
-        return result
-    except Exception as e:
-        logger.error(f"get_top_active_users error: {e}")
-        return []
+@cached_analytics(fallback=[])
+def get_top_active_users(limit=10, start_date=None, end_date=None):
+    logs = ActivityLog.objects.all()
+    if start_date and end_date:
+        logs = logs.filter(timestamp__date__range=[start_date, end_date])
+
+    top = list(logs.values('user__username', 'user__id').annotate(
+        count=Count('id')
+    ).order_by('-count')[:limit])
+    user_map = User.objects.only('id', 'username').in_bulk(
+        [item['user__id'] for item in top]
+    )
+
+    result = []
+    for item in top:
+        user = user_map.get(item['user__id'])
+        if user is None:
+            continue
+        result.append({'user': user, 'username': item['user__username'],
+                       'count': item['count']})
+    return result
 
 def prepare_export_data(start_date, end_date, department=None):
     try:
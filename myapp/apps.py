@@ -6,4 +6,10 @@ class MyappConfig(AppConfig):
     verbose_name       = "Helpdesk Management System"
 
     def ready(self):
-        import myapp.models  
\ No newline at end of file
+        from . import signals  # noqa: F401 -- connects the cache-invalidation receivers
+        from django.contrib import admin
+
+        admin.site.site_header = "Helpdesk Administration"
+        admin.site.site_title  = "Helpdesk Admin Portal"
+        admin.site.index_title = "Welcome to Helpdesk Admin Panel"
+        admin.site.login_url   = '/admin/login/'
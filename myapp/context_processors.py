@@ -1,7 +1,9 @@
-from myapp.models import Notification, TaskDetail, Department, DepartmentMember, MyCart
-from django.db.models import Q
+from myapp.models import Notification, TaskDetail, Department, MyCart
+from django.db.models import Count, Q, Window
 from django.urls import reverse
-from .decorators import get_user_department_context
+from django.utils.functional import SimpleLazyObject
+from functools import partial
+from .decorators import get_user_department_context, get_user_memberships
 
 
 def task_count(request):
@@ -9,7 +11,12 @@ def task_count(request):
     Global context injected into every template.
     Provides: notification counts, task counts, role flags,
     department list, primary department, sidebar nav URLs.
+    Memoized on the request, as templates may build several contexts.
     """
+    cached = getattr(request, '_task_count_ctx', None)
+    if cached is not None:
+        return cached
+
     if not request.user.is_authenticated:
         return {
             'task_count':              0,
@@ -21,14 +28,8 @@ def task_count(request):
             'is_agent':                False,
             'is_admin':                False,
             'user_departments':        Department.objects.none(),
-            'user_department_count':   0,
-            'department_open_tasks':   0,
-            'is_department_lead':      False,
-            'is_department_manager':   False,
-            'is_department_member':    False,
             'recent_notifications':    [],
-            'department_count':        0,
-            'department_tasks_count':  0,
+            'dept_ctx':                get_user_department_context(request.user),
             'primary_department':      None,
             'dashboard_url':           '/',
         }
@@ -42,58 +43,61 @@ def task_count(request):
     user_role = 'ADMIN' if is_admin else 'USER'
 
                                                                                 
-    memberships = DepartmentMember.objects.filter(
-        user=user, is_active=True
-    ).select_related('department').order_by('department__name')
+    memberships = get_user_memberships(user)
 
     department_ids = [m.department_id for m in memberships]
 
                                                                              
-    primary_membership = memberships.first()
+    primary_membership = memberships[0] if memberships else None
     primary_department = primary_membership.department if primary_membership else None
 
                                                                                 
     dashboard_url = reverse('base')
 
-    my_department_url = reverse('department_members') if memberships.exists() else None
+    my_department_url = reverse('department_members') if memberships else None
 
                                                                                 
                                                        
-    inbox_count = TaskDetail.objects.filter(
-        ~Q(TASK_STATUS__in=['Closed', 'Resolved', 'Expired'])
-    ).filter(
-        Q(assigned_department_id__in=department_ids) | Q(assigned_to=user)
-    ).distinct().count()
-
-    my_tasks_count = TaskDetail.objects.filter(TASK_CREATED=user).count()
-    my_open_tasks  = TaskDetail.objects.filter(
-        TASK_CREATED=user, TASK_STATUS='Open'
-    ).count()
+    # Restricting to the user's rows up front lets SQLite use a multi-index OR
+    # over the three foreign-key indexes instead of scanning every task.
+    inbox_q = Q(assigned_department_id__in=department_ids) | Q(assigned_to=user)
+    task_counts = TaskDetail.objects.filter(inbox_q | Q(TASK_CREATED=user)).aggregate(
+        inbox=Count('id', filter=(
+            ~Q(TASK_STATUS__in=['Closed', 'Resolved', 'Expired']) & inbox_q
+        )),
+        mine=Count('id', filter=Q(TASK_CREATED=user)),
+        mine_open=Count('id', filter=Q(TASK_CREATED=user, TASK_STATUS='Open')),
+    )
 
     my_cart_count = MyCart.objects.filter(user=user).count()
 
                                                                                 
-    notifications_qs = Notification.objects.filter(
-        user=user
-    ).select_related('task', 'task__assigned_department')
+    notifications_qs = Notification.objects.filter(user=user)
 
     if not is_admin:
         notifications_qs = notifications_qs.filter(
             task__assigned_department_id__in=department_ids
         )
 
-    unread_notifications = notifications_qs.filter(is_read=False).count()
-    recent_notifications = notifications_qs.order_by('-created_at')[:5]
+    # The windowed count covers every matching row, not just the five fetched.
+    recent_notifications = list(notifications_qs.select_related('task').annotate(
+        unread_total=Window(Count('id', filter=Q(is_read=False)))
+    ).order_by('-created_at')[:5])
+    unread_notifications = (
+        recent_notifications[0].unread_total if recent_notifications else 0
+    )
 
                                                                                 
-    dept_context = get_user_department_context(user)
+    # Read as {{ dept_ctx.is_department_lead }} etc.; the queries only run
+    # when a template first looks inside it.
+    dept_context = SimpleLazyObject(partial(get_user_department_context, user))
 
-    return {
+    ctx = {
                 
-        'task_count':            inbox_count,
+        'task_count':            task_counts['inbox'],
         'unread_notifications':  unread_notifications,
-        'my_tasks_count':        my_tasks_count,
-        'my_open_tasks':         my_open_tasks,
+        'my_tasks_count':        task_counts['mine'],
+        'my_open_tasks':         task_counts['mine_open'],
         'my_cart_count':         my_cart_count,
 
               
@@ -111,5 +115,7 @@ def task_count(request):
         'recent_notifications':  recent_notifications,
 
                                                                                
-        **dept_context,
+        'dept_ctx':              dept_context,
     }
+    request._task_count_ctx = ctx
+    return ctx
@@ -1,12 +1,18 @@
+from functools import lru_cache
+
 from django.contrib import messages
 from django.http import HttpResponseForbidden
 from django.shortcuts import redirect
 from django.urls import reverse
 
 
+@lru_cache(maxsize=1)
+def _login_path():
+    return reverse("login")
+
+
 def csrf_failure(request, reason=""):
-    login_path = reverse("login")
-    if request.path == login_path:
+    if request.path == _login_path():
         messages.error(
             request,
             "Your login form expired in another tab. Please try signing in again.",
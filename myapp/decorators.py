@@ -1,41 +1,81 @@
-from functools import wraps
+from functools import lru_cache, wraps
 from django.shortcuts import redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
+from django.db.models import Count, Q
 from django.utils import timezone
-from .models import DepartmentMember, Department, TaskDetail
+from .models import DepartmentMember, Department, TaskDetail, MyCart
 
+TASK_DECORATOR_QS = TaskDetail.objects.select_related(
+    'TASK_CREATED', 'assigned_to', 'assigned_department'
+)
+
+USER_DEPTS_KEY = 'user_depts:{}'
 
 def is_admin_user(user):
     if not user or not user.is_authenticated:
         return False
     return user.is_superuser
 
+def _get_membership(user, department):
+    """Active DepartmentMember for (user, department), memoized on the user object."""
+    members = getattr(user, '_dept_member_cache', None)
+    if members is None:
+        members = user._dept_member_cache = {}
+    key = getattr(department, 'pk', department)
+    if key not in members:
+        members[key] = DepartmentMember.objects.filter(
+            user=user, department=department, is_active=True
+        ).only('role', 'can_assign_tickets', 'can_close_tickets', 'can_delete_tickets').first()
+    return members[key]
+
+
 def user_is_department_member(user, department):
     if not user.is_authenticated or user.is_superuser:
         return False
-    return DepartmentMember.objects.filter(
-        user=user, department=department, is_active=True
-    ).exists()
+    return _get_membership(user, department) is not None
 
 
 def user_department_role(user, department):
-    try:
-        return DepartmentMember.objects.get(
-            user=user, department=department, is_active=True
-        ).role
-    except DepartmentMember.DoesNotExist:
-        return None
+    member = _get_membership(user, department)
+    return member.role if member else None
 
 
 def user_has_department_permission(user, department, permission_type):
-    try:
-        member = DepartmentMember.objects.get(
-            user=user, department=department, is_active=True
-        )
-        return getattr(member, permission_type, False)
-    except DepartmentMember.DoesNotExist:
-        return False
+    member = _get_membership(user, department)
+    return getattr(member, permission_type, False) if member else False
+
+
+def _get_user_department_ids(user):
+    """Ids of the user's active memberships, memoized on the user object."""
+    dept_ids = getattr(user, '_dept_ids', None)
+    if dept_ids is None:
+        dept_ids = user._dept_ids = list(DepartmentMember.objects.filter(
+            user=user, is_active=True
+        ).order_by().values_list('department_id', flat=True))
+    return dept_ids
+
+
+def get_user_memberships(user):
+    """
+    Active memberships with their departments, ordered by department name.
+    Returns a list, cached per user between requests and memoized on the
+    user object so the middleware, views and context processors share it.
+    """
+    memberships = getattr(user, '_dept_memberships', None)
+    if memberships is None:
+        key = USER_DEPTS_KEY.format(user.pk)
+        memberships = cache.get(key)
+        if memberships is None:
+            memberships = list(DepartmentMember.objects.filter(
+                user=user, is_active=True
+            ).select_related('department').defer(
+                'department__description'
+            ).order_by('department__name'))
+            cache.set(key, memberships, 300)
+        user._dept_memberships = memberships
+    return memberships
 
 
 def get_user_departments(user):
@@ -43,11 +83,18 @@ def get_user_departments(user):
         return Department.objects.none()
 
     return Department.objects.filter(
-        departmentmember__user=user,
-        departmentmember__is_active=True,
-        is_active=True,
-    ).distinct()
+        id__in=_get_user_department_ids(user), is_active=True
+    )
     
+def user_has_any_department(user):
+    return any(m.department.is_active for m in get_user_memberships(user))
+
+
+def get_user_roles(user):
+    """Roles across the user's active memberships."""
+    return {m.role for m in get_user_memberships(user)}
+
+
 def is_department_lead_or_higher(user, department):
     role = user_department_role(user, department)
     return role in ['LEAD', 'MANAGER', 'HEAD']
@@ -62,7 +109,6 @@ def can_user_accept_task(user, task):
     if task.TASK_CREATED == user:
         return False, 'You cannot accept your own task'
 
-    from .models import MyCart
     if MyCart.objects.filter(task=task, user=user).exists():
         return False, 'Task already in your queue'
 
@@ -100,32 +146,32 @@ def can_user_close_task(user, task):
 def filter_tasks_by_department_access(queryset, user):
     if user.is_superuser:
         return queryset
-    from django.db.models import Q
-    user_departments = get_user_departments(user)
+    member_department_ids = DepartmentMember.objects.filter(
+        user=user, is_active=True, department__is_active=True,
+    ).values('department_id')
     return queryset.filter(
         Q(TASK_CREATED=user) |
         Q(assigned_to=user) |
-        Q(assigned_department__in=user_departments) |
+        Q(assigned_department_id__in=member_department_ids) |
         Q(assigned_department__isnull=True)
-    ).distinct()
+    )
 
 
 def get_department_statistics(department):
     """Per-department stats dict — used in department_dashboard view."""
-    tasks = TaskDetail.objects.filter(assigned_department=department)
-    return {
-        'total':       tasks.count(),
-        'open':        tasks.filter(TASK_STATUS='Open').count(),
-        'in_progress': tasks.filter(TASK_STATUS='In Progress').count(),
-        'closed':      tasks.filter(TASK_STATUS='Closed').count(),
-        'resolved':    tasks.filter(TASK_STATUS='Resolved').count(),
-        'overdue':     tasks.filter(
+    return TaskDetail.objects.filter(assigned_department=department).aggregate(
+        total=Count('id'),
+        open=Count('id', filter=Q(TASK_STATUS='Open')),
+        in_progress=Count('id', filter=Q(TASK_STATUS='In Progress')),
+        closed=Count('id', filter=Q(TASK_STATUS='Closed')),
+        resolved=Count('id', filter=Q(TASK_STATUS='Resolved')),
+        overdue=Count('id', filter=Q(
             TASK_STATUS='Open', TASK_DUE_DATE__lt=timezone.now().date()
-        ).count(),
-    }
+        )),
+    )
 
 def get_user_department_context(user):
-    if not user.is_authenticated:
+    if not user.is_authenticated or user.is_superuser:
         return {
             'user_departments':       Department.objects.none(),
             'user_department_count':  0,
@@ -137,33 +183,33 @@ def get_user_department_context(user):
             'department_tasks_count': 0,
         }
 
-    user_depts = get_user_departments(user)
-
-    is_lead = DepartmentMember.objects.filter(
-        user=user, role__in=['LEAD', 'MANAGER', 'HEAD'], is_active=True
-    ).exists()
-
-    is_manager = DepartmentMember.objects.filter(
-        user=user, role__in=['MANAGER', 'HEAD'], is_active=True
-    ).exists()
-
-    dept_open_tasks  = TaskDetail.objects.filter(
-        assigned_department__in=user_depts, TASK_STATUS='Open'
-    ).count()
-
-    dept_total_tasks = TaskDetail.objects.filter(
-        assigned_department__in=user_depts
-    ).count()
+    memberships = list(DepartmentMember.objects.filter(
+        user=user, is_active=True
+    ).order_by().values_list('role', 'department_id', 'department__is_active'))
+
+    roles    = {role for role, _, _ in memberships}
+    dept_ids = sorted(
+        {dept_id for _, dept_id, dept_active in memberships if dept_active}
+    )
+
+    task_counts = {'open': 0, 'total': 0}
+    if dept_ids:
+        task_counts = TaskDetail.objects.filter(
+            assigned_department_id__in=dept_ids
+        ).aggregate(
+            open=Count('id', filter=Q(TASK_STATUS='Open')),
+            total=Count('id'),
+        )
 
     return {
-        'user_departments':       user_depts,
-        'user_department_count':  user_depts.count(),
-        'is_department_member':   user_depts.exists(),
-        'is_department_lead':     is_lead,
-        'is_department_manager':  is_manager,
-        'department_open_tasks':  dept_open_tasks,
-        'department_count':       user_depts.count(),
-        'department_tasks_count': dept_total_tasks,
+        'user_departments':       Department.objects.filter(id__in=dept_ids),
+        'user_department_count':  len(dept_ids),
+        'is_department_member':   bool(dept_ids),
+        'is_department_lead':     bool(roles & {'LEAD', 'MANAGER', 'HEAD'}),
+        'is_department_manager':  bool(roles & {'MANAGER', 'HEAD'}),
+        'department_open_tasks':  task_counts['open'],
+        'department_count':       len(dept_ids),
+        'department_tasks_count': task_counts['total'],
     }
 
 def department_member_required(view_func):
@@ -177,7 +223,7 @@ def department_member_required(view_func):
             )
             return redirect('analytics_dashboard')                          
 
-        if not get_user_departments(request.user).exists():
+        if not user_has_any_department(request.user):
             messages.error(
                 request,
                 'You must be a member of a department to access this page. '
@@ -193,9 +239,9 @@ def task_department_access_required(view_func):
     @wraps(view_func)
     @login_required
     def wrapper(request, pk, *args, **kwargs):
-        task = get_object_or_404(TaskDetail, id=pk)
         if request.user.is_superuser:
             return view_func(request, pk, *args, **kwargs)
+        task = get_object_or_404(TASK_DECORATOR_QS, id=pk)
         if task.TASK_CREATED == request.user:
             return view_func(request, pk, *args, **kwargs)
         if task.assigned_to == request.user:
@@ -218,9 +264,7 @@ def department_lead_required(view_func):
     def wrapper(request, *args, **kwargs):
         if request.user.is_superuser:
             return view_func(request, *args, **kwargs)
-        if DepartmentMember.objects.filter(
-            user=request.user, role__in=['LEAD', 'MANAGER', 'HEAD'], is_active=True
-        ).exists():
+        if get_user_roles(request.user) & {'LEAD', 'MANAGER', 'HEAD'}:
             return view_func(request, *args, **kwargs)
         messages.error(request, 'Access denied. Department leadership role required.')
         return redirect('base')
@@ -231,8 +275,10 @@ def can_assign_tasks_required(view_func):
     @wraps(view_func)
     @login_required
     def wrapper(request, pk, *args, **kwargs):
-        task = get_object_or_404(TaskDetail, id=pk)
-        if request.user.is_superuser or task.TASK_CREATED == request.user:
+        if request.user.is_superuser:
+            return view_func(request, pk, *args, **kwargs)
+        task = get_object_or_404(TASK_DECORATOR_QS, id=pk)
+        if task.TASK_CREATED == request.user:
             return view_func(request, pk, *args, **kwargs)
         if task.assigned_department and user_has_department_permission(
             request.user, task.assigned_department, 'can_assign_tickets'
@@ -247,8 +293,10 @@ def can_delete_tasks_required(view_func):
     @wraps(view_func)
     @login_required
     def wrapper(request, pk, *args, **kwargs):
-        task = get_object_or_404(TaskDetail, id=pk)
-        if request.user.is_superuser or task.TASK_CREATED == request.user:
+        if request.user.is_superuser:
+            return view_func(request, pk, *args, **kwargs)
+        task = get_object_or_404(TASK_DECORATOR_QS, id=pk)
+        if task.TASK_CREATED == request.user:
             return view_func(request, pk, *args, **kwargs)
         if task.assigned_department and user_has_department_permission(
             request.user, task.assigned_department, 'can_delete_tickets'
@@ -270,6 +318,14 @@ def admin_required(view_func):
     return wrapper
 
 
+@lru_cache(maxsize=32)
+def _normalize_login_mode(mode):
+    mode = (mode or '').strip().lower()
+    if mode in LoginRoleAuthorization.MODE_CONFIG:
+        return mode
+    return LoginRoleAuthorization.DEFAULT
+
+
 class LoginRoleAuthorization:
     USER = 'user'
     ADMIN = 'admin'
@@ -282,8 +338,7 @@ class LoginRoleAuthorization:
 
     @classmethod
     def normalize_mode(cls, mode):
-        mode = (mode or '').strip().lower()
-        return mode if mode in cls.MODE_CONFIG else cls.DEFAULT
+        return _normalize_login_mode(mode)
 
     @classmethod
     def can_register(cls, mode):
@@ -1,15 +1,69 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.forms.models import ModelChoiceIterator
 
 from .models import (
     UserProfile, TaskDetail, UserComment,
     Category, KnowledgeBase,
-    Department, DepartmentMember, CannedResponse,
+    Department, CannedResponse,
     TaskRating,
 )
 
+ACTIVE_CATEGORIES_KEY  = 'active_categories_v1'
+ACTIVE_DEPARTMENTS_KEY = 'active_departments_v1'
+
+
+class CachedModelChoiceIterator(ModelChoiceIterator):
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        yield from self.field.cached_choices()
+
+    def __len__(self):
+        return len(self.field.cached_choices()) + (self.field.empty_label is not None)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(self.field.cached_choices())
+
+
+class CachedModelChoiceField(forms.ModelChoiceField):
+    """Renders its options from the cache; submitted values are still validated against the queryset.
+
+    The cache only holds the declared queryset. Assigning a new one (a view
+    narrowing the options per user) detaches the field from the shared key.
+    """
+    iterator = CachedModelChoiceIterator
+
+    def __init__(self, *args, cache_key, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_key = cache_key
+
+    def __deepcopy__(self, memo):
+        result = super().__deepcopy__(memo)
+        result.cache_key = self.cache_key
+        return result
+
+    def _set_queryset(self, queryset):
+        super()._set_queryset(queryset)
+        self.cache_key = None
+
+    queryset = property(forms.ModelChoiceField._get_queryset, _set_queryset)
+
+    def cached_choices(self):
+        if self.cache_key is None:
+            return list(self.queryset.values_list('pk', 'name'))
+        choices = cache.get(self.cache_key)
+        if choices is None:
+            choices = [(pk, name) for pk, name in self.queryset.values_list('pk', 'name')]
+            cache.set(self.cache_key, choices, 3600)
+        return choices
+
+
 class LoginForm(forms.Form):
     LOGIN_AS_CHOICES = [
         ('user', 'User'),
@@ -86,6 +140,17 @@ class RegisterForm(UserCreationForm):
             raise ValidationError("This email is already registered.")
         return email
 
+    def save(self, commit=True):
+        # auth_user_email_uniq backs the probe above when two signups race;
+        # any other integrity error (a username race, say) is not ours to relabel.
+        try:
+            with transaction.atomic():
+                return super().save(commit=commit)
+        except IntegrityError:
+            if User.objects.filter(email=self.cleaned_data['email']).exists():
+                raise ValidationError({'email': "This email is already registered."})
+            raise
+
 
 class UserProfileForm(forms.ModelForm):
     Address = forms.CharField(
@@ -146,7 +211,7 @@ class AccountSettingsForm(forms.Form):
     ]
 
     target_user = forms.ModelChoiceField(
-        queryset=User.objects.all().order_by('username'),
+        queryset=User.objects.only('id', 'username', 'is_active').order_by('username'),
         label="Select User",
         empty_label="- Choose a user -",
         widget=forms.Select(attrs={"class": "form-select"}),
@@ -156,8 +221,9 @@ class AccountSettingsForm(forms.Form):
         label="Action",
         widget=forms.RadioSelect(attrs={"class": "form-check-input"}),
     )
-    department = forms.ModelChoiceField(
+    department = CachedModelChoiceField(
         queryset=Department.objects.filter(is_active=True),
+        cache_key=ACTIVE_DEPARTMENTS_KEY,
         required=False,
         label="Department",
         empty_label="- Select department -",
@@ -174,7 +240,7 @@ class DepartmentMemberForm(forms.Form):
     ]
 
     user_id = forms.ModelChoiceField(
-        queryset=User.objects.filter(is_active=True).order_by('username'),
+        queryset=User.objects.filter(is_active=True).only('id', 'username').order_by('username'),
         label="Select User",
         empty_label="- Choose a user -",
         widget=forms.Select(attrs={"class": "form-select"}),
@@ -210,21 +276,24 @@ class TaskDetailForm(forms.ModelForm):
         }),
         help_text="Provide as much detail as possible",
     )
-    category = forms.ModelChoiceField(
+    category = CachedModelChoiceField(
         queryset=Category.objects.filter(is_active=True),
+        cache_key=ACTIVE_CATEGORIES_KEY,
         required=False,
         empty_label="Select Category",
         widget=forms.Select(attrs={'class': 'form-select'}),
         label="Category",
     )
-    priority = forms.ChoiceField(
+    priority = forms.TypedChoiceField(
         choices=[('', 'Select Priority')] + TaskDetail.PRIORITY_CHOICES,
         required=False,
+        empty_value=None,
         widget=forms.Select(attrs={"class": "form-select"}),
         label="Priority",
     )
-    assigned_department = forms.ModelChoiceField(
+    assigned_department = CachedModelChoiceField(
         queryset=Department.objects.filter(is_active=True),
+        cache_key=ACTIVE_DEPARTMENTS_KEY,
         required=False,
         empty_label="- Select department -",
         widget=forms.Select(attrs={'class': 'form-select'}),
@@ -270,20 +339,23 @@ class TaskUpdateForm(forms.ModelForm):
         widget=forms.Select(attrs={"class": "form-select"}),
         label="Status",
     )
-    priority = forms.ChoiceField(
+    priority = forms.TypedChoiceField(
         choices=TaskDetail.PRIORITY_CHOICES,
         required=False,
+        empty_value=None,
         widget=forms.Select(attrs={"class": "form-select"}),
         label="Priority",
     )
-    category = forms.ModelChoiceField(
+    category = CachedModelChoiceField(
         queryset=Category.objects.filter(is_active=True),
+        cache_key=ACTIVE_CATEGORIES_KEY,
         required=False,
         widget=forms.Select(attrs={"class": "form-select"}),
         label="Category",
     )
-    assigned_department = forms.ModelChoiceField(
+    assigned_department = CachedModelChoiceField(
         queryset=Department.objects.filter(is_active=True),
+        cache_key=ACTIVE_DEPARTMENTS_KEY,
         required=False,
         empty_label="Not Assigned",
         widget=forms.Select(attrs={"class": "form-select"}),
@@ -309,13 +381,11 @@ class TaskUpdateForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         instance = kwargs.get('instance')
         if instance and instance.assigned_department:
-            dept_user_ids = DepartmentMember.objects.filter(
-                department=instance.assigned_department,
-                is_active=True,
-            ).values_list('user_id', flat=True)
             self.fields['assigned_to'].queryset = User.objects.filter(
-                id__in=dept_user_ids, is_active=True
-            ).order_by('username')
+                department_memberships__department=instance.assigned_department,
+                department_memberships__is_active=True,
+                is_active=True,
+            ).only('id', 'username').order_by('username')
             self.fields['assigned_to'].help_text = (
                 f"Members of {instance.assigned_department.name}"
             )
@@ -336,15 +406,17 @@ class TaskFilterForm(forms.Form):
         choices=[('', 'All Priorities')] + TaskDetail.PRIORITY_CHOICES,
         widget=forms.Select(attrs={'class': 'form-select'}),
     )
-    category = forms.ModelChoiceField(
+    category = CachedModelChoiceField(
         required=False,
         queryset=Category.objects.filter(is_active=True),
+        cache_key=ACTIVE_CATEGORIES_KEY,
         widget=forms.Select(attrs={'class': 'form-select'}),
         empty_label="All Categories",
     )
-    department = forms.ModelChoiceField(
+    department = CachedModelChoiceField(
         required=False,
         queryset=Department.objects.filter(is_active=True),
+        cache_key=ACTIVE_DEPARTMENTS_KEY,
         widget=forms.Select(attrs={'class': 'form-select'}),
         empty_label="All Departments",
         label="Department",
@@ -437,12 +509,19 @@ class CannedResponseForm(forms.ModelForm):
 
 class CannedResponseSelectForm(forms.Form):
     canned_response = forms.ModelChoiceField(
-        queryset=CannedResponse.objects.filter(is_active=True),
+        queryset=CannedResponse.objects.filter(is_active=True).only(
+            'id', 'title'
+        ).order_by('-usage_count', 'title'),
         required=False,
         empty_label="Select a canned response...",
         widget=forms.Select(attrs={'class': 'form-select', 'id': 'cannedResponseSelect'}),
     )
 
+    def __init__(self, *args, responses=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if responses is not None:
+            self.fields['canned_response'].queryset = responses
+
 
 class TaskRatingForm(forms.ModelForm):
     class Meta:
@@ -469,7 +548,6 @@ class TaskRatingForm(forms.ModelForm):
 
 
 def get_available_canned_responses(user, category=None, department=None):
-    from django.db.models import Q
     qs = CannedResponse.objects.filter(is_active=True).filter(
         Q(is_public=True) | Q(created_by=user)
     )
@@ -477,4 +555,4 @@ def get_available_canned_responses(user, category=None, department=None):
         qs = qs.filter(Q(category=category) | Q(category__isnull=True))
     if department:
         qs = qs.filter(Q(department=department) | Q(department__isnull=True))
-    return qs.order_by('-usage_count', 'title')
+    return qs.defer('content').order_by('-usage_count', 'title')
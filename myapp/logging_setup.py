@@ -0,0 +1,38 @@
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+# Request threads only enqueue records; the listener thread owns the file.
+LOG_QUEUE = queue.Queue(-1)
+
+_listener = None
+
+
+def start_log_listener(filename):
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    _listener = QueueListener(LOG_QUEUE, logging.FileHandler(filename),
+                              respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return _listener
+
+
+class LazyQueueHandler(QueueHandler):
+    """QueueHandler that starts the file listener on its first record.
+
+    Processes that never log to the file (migrate, shell, the autoreloader
+    parent) therefore never start the listener thread.
+    """
+
+    def __init__(self, queue, filename):
+        super().__init__(queue)
+        self.filename = filename
+
+    def enqueue(self, record):
+        # Handler.handle() holds self.lock here, so only one listener starts.
+        start_log_listener(self.filename)
+        super().enqueue(record)
@@ -1,8 +1,15 @@
 from django.core.management.base import BaseCommand
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from myapp.signals import invalidate_analytics_cache
+from myapp.decorators import USER_DEPTS_KEY
 from myapp.models import Department, DepartmentMember
 
 
+CHUNK_SIZE = 2000
+
+
 class Command(BaseCommand):
     help = 'Assign all existing users to appropriate departments'
     
@@ -35,35 +42,58 @@ class Command(BaseCommand):
             )
             return
         
-        all_users = User.objects.all()
-        assigned_count = 0
+        all_users = User.objects.filter(is_superuser=False).only('id', 'username')
+        to_create = []
+        assigned_ids = []
         
-        for user in all_users:
-                                                                   
-            if user.is_superuser:
-                continue
-
-            if DepartmentMember.objects.filter(user=user).exists():
-                continue
-            
-            DepartmentMember.objects.create(
-                user=user,
-                department=default_dept,
-                role=default_role,
-                can_assign_tickets=False,
-                can_close_tickets=True,
-                can_delete_tickets=False
+        # One transaction for the pre-fetch and every chunk: a single commit, and
+        # the member-id snapshot stays consistent with the inserts.
+        with transaction.atomic():
+            # Users already in any department are skipped; that rule is wider than the
+            # (user, department) unique key, so the pre-fetch stays. Concurrent runs
+            # racing on the same user collide on that key and ignore_conflicts drops
+            # the duplicate insert.
+            existing_ids = set(
+                DepartmentMember.objects.order_by().values_list('user_id', flat=True)
             )
+            for user in all_users.iterator(chunk_size=CHUNK_SIZE):
+                if user.id in existing_ids:
+                    continue
+                
+                to_create.append(DepartmentMember(
+                    user=user,
+                    department=default_dept,
+                    role=default_role,
+                    can_assign_tickets=False,
+                    can_close_tickets=True,
+                    can_delete_tickets=False,
+                ))
+                
+                if len(to_create) >= CHUNK_SIZE:
+                    assigned_ids += self._flush(to_create, default_dept, options['verbosity'])
             
-            assigned_count += 1
-            self.stdout.write(
-                self.style.SUCCESS(
-                    f'✓ Assigned {user.username} to {default_dept.name}'
-                )
-            )
+            assigned_ids += self._flush(to_create, default_dept, options['verbosity'])
+        
+        assigned_count = len(assigned_ids)
+        if assigned_count:
+            # bulk_create skips post_save, so drop the cached member lists and bump
+            # the analytics cache version by hand, once the rows are committed
+            cache.delete_many([USER_DEPTS_KEY.format(user_id) for user_id in assigned_ids])
+            invalidate_analytics_cache(sender=DepartmentMember)
         
         self.stdout.write(
             self.style.SUCCESS(
                 f'\n✓ Successfully assigned {assigned_count} users to {default_dept.name} department'
             )
-        )
\ No newline at end of file
+        )
+
+    def _flush(self, to_create, department, verbosity):
+        DepartmentMember.objects.bulk_create(to_create, batch_size=1000, ignore_conflicts=True)
+        if verbosity and to_create:
+            # One write per chunk rather than one per user.
+            self.stdout.write(self.style.SUCCESS('\n'.join(
+                f'✓ Assigned {m.user.username} to {department.name}' for m in to_create
+            )))
+        user_ids = [m.user_id for m in to_create]
+        to_create.clear()
+        return user_ids
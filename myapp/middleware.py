@@ -1,7 +1,9 @@
+from functools import lru_cache, partial
 from django.shortcuts import redirect
 from django.contrib import messages
 from django.urls import reverse, resolve, NoReverseMatch
-from .models import DepartmentMember
+from django.utils.functional import SimpleLazyObject
+from .decorators import get_user_memberships
 
 
 class DepartmentAccessMiddleware:
@@ -10,11 +12,12 @@ class DepartmentAccessMiddleware:
     1. Exempts public/auth URLs from authentication checks.
     2. Ensures non-superuser authenticated users without a department
        cannot access department-restricted pages.
-    3. Attaches user_departments to every request for convenience.
+    3. Attaches user_departments to every request for convenience, as a
+       lazily evaluated list of active DepartmentMember rows.
     """
 
                                                                
-    EXEMPT_URL_NAMES = {
+    EXEMPT_URL_NAMES = frozenset({
         'landing',
         'login',
         'logout',
@@ -31,7 +34,7 @@ class DepartmentAccessMiddleware:
         'mark_notification_read',
         'mark_all_read',
         'delete_notification',
-    }
+    })
 
                                                     
     EXEMPT_PATH_PREFIXES = (
@@ -43,44 +46,45 @@ class DepartmentAccessMiddleware:
 
     def __init__(self, get_response):
         self.get_response = get_response
+        self._exempt_names = self.EXEMPT_URL_NAMES
+        self._exempt_prefixes = tuple(self.EXEMPT_PATH_PREFIXES)
+        # Exempt routes without URL arguments can be matched on the exact path;
+        # only the remaining ones need a resolve() on each request.
+        exempt_paths = set()
+        for name in self._exempt_names:
+            try:
+                exempt_paths.add(reverse(name))
+            except NoReverseMatch:
+                pass
+        self._exempt_paths = frozenset(exempt_paths)
+        # Exemption depends only on the path and the URLconf, both fixed at
+        # runtime, so each path is decided once per process.
+        self._is_exempt = lru_cache(maxsize=2048)(self._path_is_exempt)
+
+    def _path_is_exempt(self, path):
+        if path.startswith(self._exempt_prefixes) or path in self._exempt_paths:
+            return True
+        try:
+            current_url_name = resolve(path).url_name
+        except Exception:
+            current_url_name = ''
+        return current_url_name in self._exempt_names
 
     def __call__(self, request):
-        if not request.user.is_authenticated:
-            return self.get_response(request)
-
-                                                 
-        if request.user.is_superuser or getattr(request.user, 'is_staff', False):
+        # Exempt paths are decided before request.user is touched, so static,
+        # media and public pages never load the session user.
+        if self._is_exempt(request.path):
             return self.get_response(request)
 
-        path = request.path
-
-                                                         
-        if any(path.startswith(p) for p in self.EXEMPT_PATH_PREFIXES):
+        if not request.user.is_authenticated:
             return self.get_response(request)
 
-                                                      
-        try:
-            current_url_name = resolve(path).url_name
-        except Exception:
-            current_url_name = ''
-
-        if current_url_name in self.EXEMPT_URL_NAMES:
+                                                 
+        if request.user.is_superuser or request.user.is_staff:
             return self.get_response(request)
 
                                                                         
-        request.user_departments = DepartmentMember.objects.filter(
-            user=request.user,
-            is_active=True,
-        ).select_related('department')
+        # Nothing is read until a view or template touches user_departments.
+        request.user_departments = SimpleLazyObject(partial(get_user_memberships, request.user))
 
         return self.get_response(request)
-
-
-class TaskAccessMiddleware:
-    """Placeholder for future per-task access enforcement at middleware level."""
-
-    def __init__(self, get_response):
-        self.get_response = get_response
-
-    def __call__(self, request):
-        return self.get_response(request)
\ No newline at end of file
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-16 03:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='taskdetail',
+            index=models.Index(condition=models.Q(('category__isnull', False)), fields=['category'], name='taskdetail_cat_nn_idx'),
+        ),
+    ]
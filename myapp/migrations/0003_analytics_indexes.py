@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-16 03:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0002_taskdetail_taskdetail_cat_nn_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['timestamp', 'user'], name='myapp_activ_timesta_e8edcb_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskdetail',
+            index=models.Index(fields=['TASK_CREATED_ON', 'TASK_STATUS'], name='myapp_taskd_TASK_CR_aa4abe_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskdetail',
+            index=models.Index(fields=['assigned_department', 'TASK_STATUS', '-TASK_CREATED_ON'], name='td_dept_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskdetail',
+            index=models.Index(fields=['TASK_STATUS', 'TASK_CLOSED_ON'], name='myapp_taskd_TASK_ST_f202f0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskdetail',
+            index=models.Index(fields=['priority'], name='myapp_taskd_priorit_b31147_idx'),
+        ),
+    ]
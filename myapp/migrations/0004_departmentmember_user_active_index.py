@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-16 03:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0003_analytics_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='departmentmember',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['user', 'department'], name='deptmem_user_active_idx'),
+        ),
+    ]
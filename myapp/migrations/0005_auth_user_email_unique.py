@@ -0,0 +1,44 @@
+import sys
+
+from django.db import migrations
+from django.db.models import Count
+
+# auth_user belongs to django.contrib.auth, so the index is raw SQL and is not
+# part of any model state; makemigrations neither sees nor tracks it.
+CREATE_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS auth_user_email_uniq ON auth_user (email) WHERE email <> ''"
+DROP_INDEX   = "DROP INDEX IF EXISTS auth_user_email_uniq"
+
+
+def create_email_index(apps, schema_editor):
+    User = apps.get_model('auth', 'User')
+    duplicates = list(
+        User.objects.exclude(email='').values('email')
+        .annotate(n=Count('id')).filter(n__gt=1)
+        .order_by('email').values_list('email', flat=True)
+    )
+    if duplicates:
+        # Existing duplicates would abort the migration; leave the index out and
+        # keep relying on RegisterForm.clean_email until they are merged.
+        sys.stderr.write(
+            "\n  Skipping auth_user_email_uniq: %d email(s) belong to more than one "
+            "user: %s\n  Resolve them, then run: %s\n"
+            % (len(duplicates), ', '.join(duplicates[:20]), CREATE_INDEX)
+        )
+        return
+    schema_editor.execute(CREATE_INDEX)
+
+
+def drop_email_index(apps, schema_editor):
+    schema_editor.execute(DROP_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('myapp', '0004_departmentmember_user_active_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_email_index, drop_email_index),
+    ]
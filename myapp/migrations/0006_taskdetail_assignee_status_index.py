@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-16 03:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0005_auth_user_email_unique'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='taskdetail',
+            index=models.Index(fields=['assigned_to', 'TASK_STATUS', '-TASK_CREATED_ON'], name='td_assignee_status_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-16 03:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0006_taskdetail_assignee_status_index'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="UPDATE myapp_taskdetail SET priority = NULL WHERE priority = ''",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddConstraint(
+            model_name='slapolicy',
+            constraint=models.CheckConstraint(check=models.Q(('response_time__gte', 1), ('resolution_time__gte', 1)), name='sla_positive_hours'),
+        ),
+        migrations.AddConstraint(
+            model_name='taskdetail',
+            constraint=models.CheckConstraint(check=models.Q(('TASK_STATUS__in', ['Open', 'In Progress', 'Closed', 'Reopen', 'Expired', 'Resolved'])), name='td_status_valid'),
+        ),
+        migrations.AddConstraint(
+            model_name='taskdetail',
+            constraint=models.CheckConstraint(check=models.Q(('priority__in', ['LOW', 'MEDIUM', 'HIGH', 'URGENT']), ('priority__isnull', True), _connector='OR'), name='td_priority_valid'),
+        ),
+    ]
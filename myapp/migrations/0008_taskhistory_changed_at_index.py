@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-16 03:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0007_task_sla_check_constraints'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='taskhistory',
+            index=models.Index(fields=['changed_at'], name='myapp_taskh_changed_4d2728_idx'),
+        ),
+    ]
@@ -2,6 +2,7 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
 from django.utils import timezone
+from django.db.backends.signals import connection_created
 from django.db.models.signals import post_migrate
 from django.dispatch import receiver
 from datetime import timedelta
@@ -61,6 +62,10 @@ class DepartmentMember(models.Model):
         ordering = ['department', '-role', 'user__username']
         verbose_name = 'Department Member'
         verbose_name_plural = 'Department Members'
+        indexes = [
+            models.Index(fields=['user', 'department'], name='deptmem_user_active_idx',
+                         condition=models.Q(is_active=True)),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.department.name} ({self.get_role_display()})"
@@ -103,7 +108,7 @@ class UserProfile(models.Model):
         return Department.objects.filter(
             departmentmember__user=self.user,
             departmentmember__is_active=True
-        ).distinct()
+        )
 
 class Category(models.Model):
     name        = models.CharField(max_length=100, unique=True)
@@ -146,6 +151,12 @@ class SLAPolicy(models.Model):
         ordering = ['priority', 'response_time']
         verbose_name = "SLA Policy"
         verbose_name_plural = "SLA Policies"
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(response_time__gte=1) & models.Q(resolution_time__gte=1),
+                name='sla_positive_hours',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} - Response: {self.response_time}h, Resolution: {self.resolution_time}h"
@@ -246,6 +257,30 @@ class TaskDetail(models.Model):
         ordering = ['-TASK_CREATED_ON']
         verbose_name = "Task"
         verbose_name_plural = "Tasks"
+        indexes = [
+            models.Index(fields=['category'], name='taskdetail_cat_nn_idx',
+                         condition=models.Q(category__isnull=False)),
+            models.Index(fields=['TASK_CREATED_ON', 'TASK_STATUS']),
+            models.Index(fields=['assigned_department', 'TASK_STATUS', '-TASK_CREATED_ON'],
+                         name='td_dept_status_idx'),
+            models.Index(fields=['assigned_to', 'TASK_STATUS', '-TASK_CREATED_ON'],
+                         name='td_assignee_status_idx'),
+            models.Index(fields=['TASK_STATUS', 'TASK_CLOSED_ON']),
+            models.Index(fields=['priority']),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(TASK_STATUS__in=[
+                    'Open', 'In Progress', 'Closed', 'Reopen', 'Expired', 'Resolved',
+                ]),
+                name='td_status_valid',
+            ),
+            models.CheckConstraint(
+                check=models.Q(priority__in=['LOW', 'MEDIUM', 'HIGH', 'URGENT'])
+                      | models.Q(priority__isnull=True),
+                name='td_priority_valid',
+            ),
+        ]
 
     def __str__(self):
         return f"#{self.id} - {self.TASK_TITLE}"
@@ -273,16 +308,17 @@ class TaskDetail(models.Model):
 
     def check_sla_breach(self):
         now = timezone.now()
+        flags = (self.sla_response_breached, self.sla_resolution_breached)
         if not self.first_response_at and self.sla_response_deadline:
             if now > self.sla_response_deadline:
                 self.sla_response_breached = True
         if self.TASK_STATUS in ['Open', 'In Progress', 'Reopen'] and self.sla_resolution_deadline:
             if now > self.sla_resolution_deadline:
                 self.sla_resolution_breached = True
-        if self.sla_response_breached or self.sla_resolution_breached:
+        # Flags only ever flip to True, so write only when one just did.
+        if (self.sla_response_breached, self.sla_resolution_breached) != flags:
             self.save(update_fields=['sla_response_breached', 'sla_resolution_breached'])
-            return True
-        return False
+        return self.sla_response_breached or self.sla_resolution_breached
 
     @property
     def sla_status(self):
@@ -386,6 +422,7 @@ class ActivityLog(models.Model):
         indexes = [
             models.Index(fields=['user', '-timestamp']),
             models.Index(fields=['task', '-timestamp']),
+            models.Index(fields=['timestamp', 'user']),
         ]
 
     def __str__(self):
@@ -666,7 +703,10 @@ class TaskHistory(models.Model):
         ordering = ['-changed_at']
         verbose_name = "Task History"
         verbose_name_plural = "Task History"
-        indexes = [models.Index(fields=['task', '-changed_at'])]
+        indexes = [
+            models.Index(fields=['task', '-changed_at']),
+            models.Index(fields=['changed_at']),
+        ]
 
     def __str__(self):
         return f"Task #{self.task.id} - {self.action_type} by {self.changed_by}"
@@ -798,3 +838,20 @@ def create_default_categories(sender, **kwargs):
     )
     if created:
         print(f"Created {created} categories")
+
+
+SQLITE_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA cache_size=-20000',
+    'PRAGMA temp_store=MEMORY',
+)
+
+
+@receiver(connection_created)
+def configure_sqlite_connection(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
@@ -0,0 +1,42 @@
+import time
+
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .analytics import ANALYTICS_VERSION_KEY
+from .decorators import USER_DEPTS_KEY
+from .forms import ACTIVE_CATEGORIES_KEY, ACTIVE_DEPARTMENTS_KEY
+from .models import Category, Department, DepartmentMember, TaskDetail, TaskHistory
+
+
+@receiver([post_save, post_delete], sender=TaskDetail)
+@receiver([post_save, post_delete], sender=TaskHistory)
+@receiver([post_save, post_delete], sender=Department)
+@receiver([post_save, post_delete], sender=DepartmentMember)
+def invalidate_analytics_cache(sender, **kwargs):
+    cache.set(ANALYTICS_VERSION_KEY, time.time_ns(), None)
+
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_category_choices(sender, **kwargs):
+    cache.delete(ACTIVE_CATEGORIES_KEY)
+
+
+@receiver([post_save, post_delete], sender=Department)
+def invalidate_department_choices(sender, **kwargs):
+    cache.delete(ACTIVE_DEPARTMENTS_KEY)
+
+
+@receiver([post_save, post_delete], sender=DepartmentMember)
+def invalidate_user_memberships(sender, instance, **kwargs):
+    cache.delete(USER_DEPTS_KEY.format(instance.user_id))
+
+
+@receiver(post_save, sender=Department)
+def invalidate_department_member_lists(sender, instance, **kwargs):
+    # Cached lists carry the department row (name, is_active), so drop them for its members.
+    user_ids = DepartmentMember.objects.filter(
+        department=instance
+    ).order_by().values_list('user_id', flat=True)
+    cache.delete_many([USER_DEPTS_KEY.format(user_id) for user_id in user_ids])
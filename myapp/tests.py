@@ -0,0 +1,378 @@
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import analytics
+from .context_processors import task_count
+from .decorators import (
+    can_assign_tasks_required, can_delete_tasks_required,
+    can_user_close_task, can_user_update_task, get_user_memberships,
+    get_user_roles, task_department_access_required,
+)
+from .forms import RegisterForm, TaskDetailForm
+from .models import Department, DepartmentMember, TaskDetail
+
+
+def make_task(creator, department=None, **kwargs):
+    fields = {
+        'TASK_TITLE':       'Printer offline',
+        'TASK_DESCRIPTION': 'Second floor printer is offline',
+        'TASK_HOLDER':      creator.username,
+        'TASK_DUE_DATE':    date.today() + timedelta(days=3),
+        'TASK_STATUS':      'Open',
+    }
+    fields.update(kwargs)
+    return TaskDetail.objects.create(
+        TASK_CREATED=creator, assigned_department=department, **fields
+    )
+
+
+class HelpdeskTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.it      = Department.objects.get(code='IT')
+        cls.hr      = Department.objects.get(code='HR')
+        cls.creator = User.objects.create_user('creator', 'creator@example.com', 'pw')
+        cls.member  = User.objects.create_user('member', 'member@example.com', 'pw')
+        cls.admin   = User.objects.create_superuser('root', 'root@example.com', 'pw')
+        DepartmentMember.objects.create(user=cls.member, department=cls.it)
+
+    def setUp(self):
+        cache.clear()
+
+    def count_queries(self, func):
+        with CaptureQueriesContext(connection) as ctx:
+            func()
+        return len(ctx.captured_queries)
+
+
+class AdminChangelistTests(HelpdeskTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.admin)
+
+    def test_department_member_changelist_query_count_is_flat(self):
+        url = reverse('admin:myapp_departmentmember_changelist')
+        self.client.get(url)  # warm the content-type cache
+        small = self.count_queries(lambda: self.client.get(url))
+
+        for i in range(10):
+            user = User.objects.create_user(f'agent{i}', f'agent{i}@example.com', 'pw')
+            DepartmentMember.objects.create(user=user, department=self.hr)
+        large = self.count_queries(lambda: self.client.get(url))
+        self.assertEqual(small, large)
+
+    def test_task_search_matches_every_search_field(self):
+        by_title = make_task(self.creator, self.it, TASK_TITLE='VPN drops hourly')
+        by_description = make_task(self.creator, self.it, TASK_TITLE='Laptop',
+                                   TASK_DESCRIPTION='Cannot reach the VPN from home')
+        response = self.client.get(reverse('admin:myapp_taskdetail_changelist'), {'q': 'vpn'})
+        found = {task.pk for task in response.context['cl'].result_list}
+        self.assertEqual(found, {by_title.pk, by_description.pk})
+
+    def test_task_changelist_skips_unfiltered_count(self):
+        make_task(self.creator, self.it)
+        url = reverse('admin:myapp_taskdetail_changelist')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, {'TASK_STATUS__exact': 'Open'})
+        self.assertEqual(response.status_code, 200)
+        unfiltered_counts = [
+            q['sql'] for q in ctx.captured_queries
+            if q['sql'].startswith('SELECT COUNT(*)')
+            and 'myapp_taskdetail' in q['sql'] and 'WHERE' not in q['sql']
+        ]
+        self.assertEqual(unfiltered_counts, [])
+
+
+class MembershipCacheTests(HelpdeskTestCase):
+
+    def memberships(self):
+        user = User.objects.get(pk=self.member.pk)
+        return [m.department_id for m in get_user_memberships(user)]
+
+    def test_cached_after_first_lookup(self):
+        self.assertEqual(self.memberships(), [self.it.id])
+        with self.assertNumQueries(1):  # the User fetch only
+            self.assertEqual(self.memberships(), [self.it.id])
+
+    def test_roles_come_from_cached_memberships(self):
+        self.memberships()
+        user = User.objects.get(pk=self.member.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_user_roles(user), {'MEMBER'})
+
+    def test_admin_remove_member_invalidates(self):
+        self.assertEqual(self.memberships(), [self.it.id])
+        self.client.force_login(self.admin)
+        self.client.get(reverse('admin_remove_member', args=[self.it.id, self.member.id]))
+        self.assertEqual(self.memberships(), [])
+
+    def test_membership_save_and_department_rename_invalidate(self):
+        self.memberships()
+        DepartmentMember.objects.create(user=self.member, department=self.hr)
+        self.assertEqual(sorted(self.memberships()), sorted([self.it.id, self.hr.id]))
+
+        self.it.name = 'IT Service Desk'
+        self.it.save()
+        user = User.objects.get(pk=self.member.pk)
+        self.assertIn('IT Service Desk', [m.department.name for m in get_user_memberships(user)])
+
+
+class AnalyticsCacheTests(HelpdeskTestCase):
+
+    def test_task_save_refreshes_cached_statistics(self):
+        make_task(self.creator, self.it)
+        before = analytics.get_task_statistics()
+        self.assertEqual(before['total'], 1)
+        self.assertEqual(before['open'], 1)
+
+        with self.assertNumQueries(0):
+            analytics.get_task_statistics()
+
+        task = make_task(self.creator, self.it)
+        self.assertEqual(analytics.get_task_statistics()['total'], 2)
+
+        task.TASK_STATUS = 'Closed'
+        task.save()
+        after = analytics.get_task_statistics()
+        self.assertEqual(after['open'], 1)
+        self.assertEqual(after['closed'], 1)
+
+    def test_department_breakdown_follows_task_save(self):
+        stats = {row['name']: row for row in analytics.get_department_statistics()}
+        self.assertEqual(stats[self.it.name]['total_tasks'], 0)
+
+        make_task(self.creator, self.it)
+        stats = {row['name']: row for row in analytics.get_department_statistics()}
+        self.assertEqual(stats[self.it.name]['total_tasks'], 1)
+
+    def test_fallback_is_not_cached(self):
+        make_task(self.creator, self.it)
+        with mock.patch.object(TaskDetail.objects, 'all', side_effect=RuntimeError('db down')), \
+                self.assertLogs('myapp.analytics', 'ERROR'):
+            self.assertEqual(analytics.get_task_statistics()['total'], 0)
+        self.assertEqual(analytics.get_task_statistics()['total'], 1)
+
+
+class TaskCountContextTests(HelpdeskTestCase):
+
+    def request(self):
+        request = RequestFactory().get('/')
+        request.user = User.objects.get(pk=self.member.pk)
+        return request
+
+    def test_query_count_and_per_request_memo(self):
+        request = self.request()
+        # memberships, task counts, cart count, recent notifications
+        with self.assertNumQueries(4):
+            task_count(request)
+        with self.assertNumQueries(0):
+            task_count(request)
+
+        # A new request reuses the cached membership list.
+        request = self.request()
+        with self.assertNumQueries(3):
+            task_count(request)
+
+    def test_department_context_runs_only_when_read(self):
+        make_task(self.creator, self.it)
+        ctx = task_count(self.request())
+        template = Template('{{ dept_ctx.is_department_member }} {{ dept_ctx.department_tasks_count }}')
+        # memberships with roles, department task counts
+        with self.assertNumQueries(2):
+            self.assertEqual(template.render(Context(ctx)), 'True 1')
+        with self.assertNumQueries(0):
+            template.render(Context(ctx))
+
+
+class TaskListQueryTests(HelpdeskTestCase):
+    """List pages must not grow their query count with the number of tasks."""
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.member)
+
+    def page_queries(self, url):
+        cache.clear()
+        return self.count_queries(lambda: self.client.get(url))
+
+    def test_dashboard_query_count_is_flat(self):
+        make_task(self.creator, self.it)
+        small = self.page_queries(reverse('base'))
+
+        for _ in range(10):
+            make_task(self.creator, self.it, priority='HIGH')
+        self.assertEqual(self.page_queries(reverse('base')), small)
+
+    def test_my_tickets_query_count_is_flat(self):
+        make_task(self.member, self.it)
+        small = self.page_queries(reverse('mycart'))
+
+        for _ in range(10):
+            make_task(self.member, self.it)
+        self.assertEqual(self.page_queries(reverse('mycart')), small)
+
+
+class PermissionCheckTests(HelpdeskTestCase):
+    """Who gets through each task permission check."""
+
+    FLAGS = ('can_assign_tickets', 'can_close_tickets', 'can_delete_tickets')
+    GUARDS = (can_assign_tasks_required, can_delete_tasks_required,
+              task_department_access_required)
+
+    def setUp(self):
+        super().setUp()
+        self.task = make_task(self.creator, self.it)
+        self.view = lambda request, pk: HttpResponse('ok')
+
+    def call(self, decorator, user):
+        request = RequestFactory().get('/')
+        request.user = User.objects.get(pk=user.pk)
+        request.session = {}
+        request._messages = FallbackStorage(request)
+        return decorator(self.view)(request, self.task.pk)
+
+    def set_flags(self, **flags):
+        DepartmentMember.objects.filter(user=self.member).update(
+            **{flag: flags.get(flag, False) for flag in self.FLAGS}
+        )
+
+    def test_member_flags_drive_each_check(self):
+        # (flag, decorator it guards)
+        for flag, decorator in (('can_assign_tickets', can_assign_tasks_required),
+                                ('can_delete_tickets', can_delete_tasks_required)):
+            for granted in (True, False):
+                with self.subTest(flag=flag, granted=granted):
+                    self.set_flags(**{flag: granted})
+                    response = self.call(decorator, self.member)
+                    self.assertEqual(response.status_code, 200 if granted else 302)
+
+        for granted in (True, False):
+            with self.subTest(flag='can_close_tickets', granted=granted):
+                self.set_flags(can_close_tickets=granted)
+                member = User.objects.get(pk=self.member.pk)
+                self.assertEqual(can_user_close_task(member, self.task)[0], granted)
+            with self.subTest(flag='can_assign_tickets', granted=granted, check='update'):
+                self.set_flags(can_assign_tickets=granted)
+                member = User.objects.get(pk=self.member.pk)
+                self.assertEqual(can_user_update_task(member, self.task)[0], granted)
+
+    def test_creator_and_superuser_pass_without_membership(self):
+        for user in (self.creator, self.admin):
+            for decorator in self.GUARDS:
+                with self.subTest(user=user.username, decorator=decorator.__name__):
+                    self.assertEqual(self.call(decorator, user).status_code, 200)
+
+    def test_outsider_is_turned_away(self):
+        outsider = User.objects.create_user('outsider', 'outsider@example.com', 'pw')
+        DepartmentMember.objects.create(user=outsider, department=self.hr,
+                                        can_assign_tickets=True, can_delete_tickets=True)
+        for decorator in self.GUARDS:
+            with self.subTest(decorator=decorator.__name__):
+                self.assertEqual(self.call(decorator, outsider).status_code, 302)
+
+    def test_inactive_membership_grants_nothing(self):
+        DepartmentMember.objects.filter(user=self.member).update(
+            is_active=False, can_assign_tickets=True, can_delete_tickets=True
+        )
+        for decorator in self.GUARDS:
+            with self.subTest(decorator=decorator.__name__):
+                self.assertEqual(self.call(decorator, self.member).status_code, 302)
+
+
+class RegisterFormTests(TestCase):
+
+    def form(self, **overrides):
+        data = {
+            'first_name': 'Asha', 'last_name': 'Rao', 'username': 'asha',
+            'email': 'asha@example.com',
+            'password1': 'Zq8!kfjw91aa', 'password2': 'Zq8!kfjw91aa',
+        }
+        data.update(overrides)
+        return RegisterForm(data)
+
+    def test_existing_email_is_rejected_in_clean(self):
+        User.objects.create_user('taken', 'asha@example.com', 'pw')
+        form = self.form()
+        self.assertFalse(form.is_valid())
+        self.assertIn('email', form.errors)
+
+    def test_email_race_becomes_a_field_error(self):
+        form = self.form()
+        self.assertTrue(form.is_valid())
+        User.objects.create_user('racer', 'asha@example.com', 'pw')
+        with self.assertRaises(ValidationError) as ctx:
+            form.save()
+        self.assertIn('email', ctx.exception.message_dict)
+
+    def test_username_race_is_not_relabelled(self):
+        form = self.form()
+        self.assertTrue(form.is_valid())
+        User.objects.create_user('asha', 'other@example.com', 'pw')
+        with self.assertRaises(IntegrityError):
+            form.save()
+
+
+class SLABreachTests(HelpdeskTestCase):
+
+    def test_writes_only_when_a_flag_flips(self):
+        past = timezone.now() - timedelta(hours=1)
+        task = make_task(self.creator, self.it, sla_response_deadline=past,
+                         sla_resolution_deadline=past)
+
+        with self.assertNumQueries(1):
+            self.assertTrue(task.check_sla_breach())
+        task.refresh_from_db()
+        self.assertTrue(task.sla_response_breached)
+        self.assertTrue(task.sla_resolution_breached)
+
+        with self.assertNumQueries(0):
+            self.assertTrue(task.check_sla_breach())
+
+    def test_no_write_while_on_track(self):
+        future = timezone.now() + timedelta(hours=4)
+        task = make_task(self.creator, self.it, sla_response_deadline=future,
+                         sla_resolution_deadline=future)
+        with self.assertNumQueries(0):
+            self.assertFalse(task.check_sla_breach())
+
+
+class CachedChoiceFieldTests(HelpdeskTestCase):
+
+    def active_department_ids(self):
+        return set(Department.objects.filter(is_active=True).values_list('id', flat=True))
+
+    def choice_ids(self, field):
+        return {pk for pk, _ in field.choices if pk != ''}
+
+    def dashboard_department_ids(self):
+        self.client.force_login(self.member)
+        response = self.client.get(reverse('base'))
+        return self.choice_ids(response.context['filter_form'].fields['department'])
+
+    def test_narrowed_dashboard_filter_does_not_poison_the_cache(self):
+        self.assertEqual(self.dashboard_department_ids(), {self.it.id})
+        field = TaskDetailForm().fields['assigned_department']
+        self.assertEqual(self.choice_ids(field), self.active_department_ids())
+
+    def test_warm_cache_does_not_widen_the_dashboard_filter(self):
+        self.choice_ids(TaskDetailForm().fields['assigned_department'])
+        self.assertEqual(self.dashboard_department_ids(), {self.it.id})
+
+    def test_declared_queryset_is_served_from_the_cache(self):
+        self.choice_ids(TaskDetailForm().fields['assigned_department'])
+        with self.assertNumQueries(0):
+            self.choice_ids(TaskDetailForm().fields['assigned_department'])
@@ -5,12 +5,15 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import PasswordChangeForm
 from django.contrib import messages
-from django.db.models import Q, Avg, OuterRef, Subquery, Count
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Q, Avg, OuterRef, Subquery, Count, Prefetch
 from django.http import HttpResponse, FileResponse, JsonResponse
 from django.utils import timezone
 from django.utils.http import url_has_allowed_host_and_scheme
 from django.core.paginator import Paginator
 from django.urls import reverse
+from collections import Counter
 from datetime import datetime, time
 import matplotlib
 matplotlib.use('Agg')
@@ -28,6 +31,8 @@ from .decorators import (
     department_member_required,
     admin_required,
     LoginRoleAuthorization,
+    USER_DEPTS_KEY,
+    get_user_memberships,
 )
 from .analytics import (
     get_date_range, get_task_statistics, get_tasks_over_time,
@@ -298,10 +303,8 @@ def Basepage(request, dept_id=None):
         return redirect('login')
 
     is_admin_user = _is_admin_user(request.user)
-    user_memberships = DepartmentMember.objects.filter(
-        user=request.user, is_active=True
-    ).select_related('department').order_by('department__name')
-    user_department_ids = list(user_memberships.values_list('department_id', flat=True))
+    user_memberships = get_user_memberships(request.user)
+    user_department_ids = [m.department_id for m in user_memberships]
 
     ticket_view = request.GET.get('view', '').strip().lower()
     is_created_view = (ticket_view == 'created')
@@ -332,11 +335,8 @@ def Basepage(request, dept_id=None):
                 ~Q(TASK_CREATED=request.user)
             )
     elif not is_admin_user:
-        department_ids = DepartmentMember.objects.filter(
-            user=request.user, is_active=True
-        ).values_list('department_id', flat=True)
         Taskdatas = Taskdatas.filter(
-            Q(assigned_department_id__in=department_ids) &
+            Q(assigned_department_id__in=user_department_ids) &
             ~Q(TASK_CREATED=request.user)
         ).distinct()
 
@@ -369,7 +369,11 @@ def Basepage(request, dept_id=None):
         if cd.get('my_tasks') or is_mine_only_filter:
             Taskdatas = Taskdatas.filter(TASK_CREATED=request.user)
 
-    paginator  = Paginator(Taskdatas.order_by('-TASK_CREATED_ON', '-id'), 20)
+    paginator  = Paginator(
+        Taskdatas.select_related('TASK_CREATED', 'assigned_to', 'assigned_department')
+                 .order_by('-TASK_CREATED_ON', '-id'),
+        20,
+    )
     page_obj   = paginator.get_page(request.GET.get('page'))
 
     if is_admin_user:
@@ -1132,8 +1136,13 @@ def RegisterView(request):
     if request.method == "POST":
         register_form = RegisterForm(request.POST)
         profile_form  = UserProfileForm(request.POST, request.FILES)
+        user = None
         if register_form.is_valid() and profile_form.is_valid():
-            user         = register_form.save()
+            try:
+                user = register_form.save()
+            except ValidationError as e:
+                register_form.add_error(None, e)
+        if user is not None:
             profile      = profile_form.save(commit=False)
             profile.user = user
             profile.save()
@@ -1197,10 +1206,8 @@ def update_profile(request, pk):
 @login_required
 def MyCarts(request):
     _sync_mycart_for_user(request.user)
-    user_memberships = DepartmentMember.objects.filter(
-        user=request.user, is_active=True
-    ).select_related('department').order_by('department__name')
-    user_department_ids = list(user_memberships.values_list('department_id', flat=True))
+    user_memberships = get_user_memberships(request.user)
+    user_department_ids = [m.department_id for m in user_memberships]
 
     carts = MyCart.objects.filter(user=request.user).select_related(
         'task', 'task__TASK_CREATED', 'task__assigned_department', 'task__category'
@@ -1722,7 +1729,7 @@ def department_members(request, dept_id=None):
         departmentmember__user=request.user,
         departmentmember__is_active=True,
         is_active=True,
-    ).distinct().order_by('name')
+    ).order_by('name')
 
     if request.user.is_superuser:
         if dept_id is not None:
@@ -1813,14 +1820,19 @@ def department_members(request, dept_id=None):
     recent_tickets = dept_tasks.order_by('-updated_at')[:8]
 
     department_sections = []
-    for d in scoped_departments:
-        dept_members = members.filter(department=d)
-        dept_member_count = dept_members.count()
+    section_departments = scoped_departments.prefetch_related(Prefetch(
+        'departmentmember_set',
+        queryset=DepartmentMember.objects.filter(is_active=True)
+            .select_related('user', 'user__userprofile').order_by('role', 'user__username'),
+        to_attr='active_members',
+    ))
+    for d in section_departments:
+        dept_members = d.active_members
         d_tasks = dept_tasks.filter(assigned_department=d)
-        d_role_counts = {r['role']: r['total'] for r in dept_members.values('role').annotate(total=Count('id'))}
+        d_role_counts = dict(sorted(Counter(m.role for m in dept_members).items()))
         department_sections.append({
             'department': d,
-            'total_members': dept_member_count,
+            'total_members': len(dept_members),
             'member_stats': _build_member_stats_for_scope(dept_members, d_tasks),
             'role_counts': d_role_counts,
             'recent_tickets': d_tasks.order_by('-updated_at')[:8],
@@ -1924,7 +1936,9 @@ def admin_add_member(request, dept_id):
 
             for task in TaskDetail.objects.filter(
                 assigned_department=department,
-            ).exclude(TASK_STATUS__in=['Closed', 'Resolved', 'Expired']):
+            ).exclude(
+                TASK_STATUS__in=['Closed', 'Resolved', 'Expired']
+            ).only('id').iterator(chunk_size=500):
                 MyCart.objects.get_or_create(user=user, task=task)
 
             log_activity(request.user, 'UPDATED',
@@ -1945,6 +1959,7 @@ def admin_remove_member(request, dept_id, user_id):
     user       = get_object_or_404(User, id=user_id)
 
     DepartmentMember.objects.filter(user=user, department=department).update(is_active=False)
+    cache.delete(USER_DEPTS_KEY.format(user.id))
 
     dept_task_ids = TaskDetail.objects.filter(
         assigned_department=department